@@ -0,0 +1,82 @@
+import re
+import time
+from pathlib import Path
+
+from blocks import code_pattern, detect_blocks, extract_title
+
+# ----------------------------
+# BENCHMARK: BLOCK DETECTION SCALING
+# ----------------------------
+# Runs blocks.detect_blocks() on slices and concatenations of a real
+# catalogue _total.txt, next to the old prefix-copying author lookbehind.
+# The old parser is quadratic, so it only runs up to LEGACY_MAX_SCALE;
+# wherever both run, the blocks must be identical.
+
+ocr_total_path = Path(__file__).parent / "samples" / "v6" / "Jitta Collectie Wat ons blijvend boeit_total.txt"
+
+SCALES = [0.125, 0.25, 0.5, 1, 2, 4, 8]  # fraction / multiple of the catalogue
+LEGACY_MAX_SCALE = 0.5
+
+
+def legacy_detect_blocks(ocr_text):
+    matches = list(code_pattern.finditer(ocr_text))
+    blocks = []
+
+    for i, match in enumerate(matches):
+        code = match.group()
+
+        start_idx = match.end()
+        end_idx = matches[i + 1].start() if i + 1 < len(matches) else len(ocr_text)
+        block_text = ocr_text[start_idx:end_idx].strip()
+
+        before_code = ocr_text[:match.start()].rstrip()
+        author_match = re.findall(r'([A-Z ,.\-\'*]+)[\.\*]?$', before_code)
+        author = author_match[-1].strip() if author_match else ""
+
+        author = re.sub(r'^[^A-Z]+', '', author)
+        author = re.sub(r'[.\*]+$', '', author)
+
+        if i > 0 and author:
+            prev_block = blocks[-1]
+            pattern = re.escape(author) + r'[\s\.\*]*$'
+            prev_block["text"] = re.sub(pattern, '', prev_block["text"]).rstrip()
+
+        title = extract_title(block_text)
+
+        if title:
+            title_pattern = re.escape(title) + r'[\s\.\*]*'
+            block_text = re.sub(r'^' + title_pattern, '', block_text, count=1).strip()
+
+        blocks.append({"code": code, "author": author, "title": title, "text": block_text})
+
+    return blocks
+
+
+def scaled_text(text, scale):
+    if scale < 1:
+        return text[:int(len(text) * scale)]
+    return " ".join([text] * int(scale))
+
+
+def time_it(fn, text):
+    start = time.perf_counter()
+    out = fn(text)
+    return time.perf_counter() - start, out
+
+
+if __name__ == "__main__":
+    catalogue = ocr_total_path.read_text(encoding="utf-8")
+
+    print(f"{'scale':>6} {'chars':>10} {'blocks':>7} {'linear s':>9} {'legacy s':>9} {'same':>5}")
+    for scale in SCALES:
+        text = scaled_text(catalogue, scale)
+        new_s, new_blocks = time_it(detect_blocks, text)
+
+        legacy = "-"
+        same = "-"
+        if scale <= LEGACY_MAX_SCALE:
+            legacy_s, legacy_blocks = time_it(legacy_detect_blocks, text)
+            legacy = f"{legacy_s:9.2f}"
+            same = "yes" if legacy_blocks == new_blocks else "NO"
+
+        print(f"{scale:>6} {len(text):>10} {len(new_blocks):>7} {new_s:9.3f} {legacy:>9} {same:>5}")
@@ -0,0 +1,85 @@
+import sys
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from bench_suite import BENCH_DIR
+from layout import attach_codes, code_pattern, extract_range, group_blocks, group_pages
+from synth_catalogue import catalogue_entries, make_catalogue
+
+# ----------------------------
+# BENCHMARK: LAYOUT GROUPING ENGINES
+# ----------------------------
+# The "loop" engine (group_blocks() per page) against the "numpy" engine
+# (group_pages() over the whole range) on main02/main03's page range 15-336:
+# grouping alone, on blocks read once, and extract_range() end to end, with
+# a check that both give the same results. Then a two-column catalogue, where
+# the loop interleaves the columns and the numpy engine with columns=True
+# keeps the codes in reading order.
+#
+#   python bench_layout.py [catalogue.pdf]   (default: a synthetic catalogue)
+
+START_PAGE = 15  # 0-indexed, as in main02.py / main03.py
+END_PAGE = 336
+REPEAT = 5
+
+
+def best_of(fn, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def read_blocks(pdf_path, start_page, end_page):
+    with fitz.open(pdf_path) as doc:
+        return [doc.load_page(n).get_text("blocks") for n in range(start_page, end_page + 1)]
+
+
+def codes_in_order(results, expected):
+    # Share of the expected codes found at their own position
+    found = [code for text in results for code in code_pattern.findall(text)]
+    return sum(a == b for a, b in zip(found, expected)) / len(expected)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        pdf_path = Path(sys.argv[1])
+    else:
+        pdf_path = make_catalogue(BENCH_DIR / f"catalogue_{END_PAGE + 1}_text.pdf", END_PAGE + 1)
+
+    start = time.perf_counter()
+    pages_blocks = read_blocks(pdf_path, START_PAGE, END_PAGE)
+    read_s = time.perf_counter() - start
+    blocks = sum(len(b) for b in pages_blocks)
+
+    loop_s, loop_groups = best_of(lambda: [group_blocks(list(b)) for b in pages_blocks])
+    numpy_s, numpy_groups = best_of(lambda: group_pages(pages_blocks))
+    print(f"📄 {pdf_path.name}: pages {START_PAGE}-{END_PAGE}, {blocks} blocks "
+          f"(get_text: {read_s:.2f} s)")
+    print(f"🐢 grouping, loop       : {loop_s * 1000:8.1f} ms")
+    print(f"🚀 grouping, numpy      : {numpy_s * 1000:8.1f} ms ({loop_s / numpy_s:.1f}x)")
+    print(f"✅ Same groups: {loop_groups == numpy_groups}")
+
+    loop_s, loop_results = best_of(lambda: extract_range(pdf_path, START_PAGE, END_PAGE), 1)
+    numpy_s, numpy_results = best_of(lambda: extract_range(pdf_path, START_PAGE, END_PAGE, engine="numpy"), 1)
+    print(f"⏱️ extract_range, loop  : {loop_s:8.2f} s")
+    print(f"⏱️ extract_range, numpy : {numpy_s:8.2f} s")
+    print(f"✅ Same results: {loop_results == numpy_results}")
+
+    # Two columns per page
+    pages = END_PAGE + 1
+    two_columns = make_catalogue(BENCH_DIR / f"catalogue_{pages}_text_2col.pdf", pages, columns=2)
+    expected = [e["code"] for entries in catalogue_entries(pages)[START_PAGE:END_PAGE + 1] for e in entries]
+    pages_blocks = read_blocks(two_columns, START_PAGE, END_PAGE)
+
+    loop_results = [r for b in pages_blocks for r in attach_codes(group_blocks(list(b)))]
+    numpy_s, grouped = best_of(lambda: group_pages(pages_blocks, columns=True))
+    column_results = [r for page in grouped for r in attach_codes(page)]
+    print(f"\n📰 Two-column catalogue, pages {START_PAGE}-{END_PAGE}")
+    print(f"   codes in reading order, loop           : {codes_in_order(loop_results, expected):6.1%}")
+    print(f"   codes in reading order, numpy + columns: {codes_in_order(column_results, expected):6.1%} "
+          f"({numpy_s * 1000:.1f} ms)")
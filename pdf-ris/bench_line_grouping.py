@@ -0,0 +1,85 @@
+import random
+import time
+
+import pandas as pd
+
+from ocr_engine import page_lines
+
+# ----------------------------
+# BENCHMARK: LINE GROUPING
+# ----------------------------
+# Compares ocr_engine.page_lines() with the df.iterrows() loop the OCR
+# scripts used before, on synthetic image_to_data dicts shaped like dense
+# catalogue pages (several blocks, >10 lines per paragraph).
+
+PAGES = 50
+BLOCKS = 4
+PARS_PER_BLOCK = 3
+LINES_PER_PAR = 14
+WORDS_PER_LINE = 9
+
+
+def legacy_page_lines(i, data):
+    df = pd.DataFrame(data)
+    df = df[df["conf"].astype(float) > 0]
+
+    page_dict = {}
+    for _, row in df.iterrows():
+        key = f"{i}_{row['par_num']}_{row['line_num']}"
+        text = str(row["text"]).strip()
+        if not text:
+            continue
+        page_dict.setdefault(key, "")
+        page_dict[key] += (" " if page_dict[key] else "") + text
+
+    return [page_dict[key] for key in sorted(page_dict.keys())]
+
+
+def synthetic_page(rng, blocks=BLOCKS, pars=PARS_PER_BLOCK, lines=LINES_PER_PAR, words=WORDS_PER_LINE):
+    columns = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text"]
+    data = {c: [] for c in columns}
+
+    def add(level, b, p, ln, w, conf, text):
+        for c, v in zip(columns, [level, 1, b, p, ln, w, rng.randint(0, 2400), rng.randint(0, 3400),
+                                  rng.randint(10, 200), rng.randint(20, 40), conf, text]):
+            data[c].append(v)
+
+    for b in range(1, blocks + 1):
+        add(2, b, 0, 0, 0, -1, "")
+        for p in range(1, pars + 1):
+            add(3, b, p, 0, 0, -1, "")
+            for ln in range(1, lines + 1):
+                add(4, b, p, ln, 0, -1, "")
+                for w in range(1, words + 1):
+                    conf = rng.choice([96.5, 91.0, 88.2, 0, -1]) if w == words else 95.0
+                    add(5, b, p, ln, w, conf, f"B{b}P{p}L{ln}W{w}")
+    return data
+
+
+def time_it(fn, pages):
+    start = time.perf_counter()
+    out = [fn(page) for page in pages]
+    return time.perf_counter() - start, out
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    pages = [synthetic_page(rng) for _ in range(PAGES)]
+    words = sum(len(p["text"]) for p in pages)
+
+    legacy_s, legacy_out = time_it(lambda p: legacy_page_lines(1, p), pages)
+    new_s, new_out = time_it(page_lines, pages)
+
+    print(f"📄 {PAGES} pages, {words} image_to_data rows")
+    print(f"🐢 iterrows loop : {legacy_s * 1000 / PAGES:8.2f} ms/page")
+    print(f"🚀 page_lines()  : {new_s * 1000 / PAGES:8.2f} ms/page  ({legacy_s / new_s:.0f}x)")
+
+    # Same words, different order: the old string keys sort "1_10" before
+    # "1_2" and merge equal (par, line) numbers from different blocks.
+    same_words = all(sorted(" ".join(a).split()) == sorted(" ".join(b).split())
+                     for a, b in zip(legacy_out, new_out))
+    print(f"✅ Same words on every page: {same_words}")
+    print(f"🔢 Lines on page 1: {len(legacy_out[0])} (old keys) vs {len(new_out[0])} (block/par/line)")
+    print(f"   old order starts: {[ln.split()[0] for ln in legacy_out[0][:3]]}")
+    print(f"   new order starts: {[ln.split()[0] for ln in new_out[0][:3]]}")
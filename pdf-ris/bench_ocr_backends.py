@@ -0,0 +1,67 @@
+import shutil
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import tess_api
+from bench_suite import BENCH_DIR
+from ocr_engine import image_data, page_lines
+from synth_catalogue import make_catalogue
+
+# ----------------------------
+# BENCHMARK: OCR BACKENDS
+# ----------------------------
+# Per-page time of pytesseract (temp file + tesseract process per page)
+# against tesserocr (engine kept in memory) on the same thresholded page
+# of a synthetic catalogue, and whether both return the same words.
+
+OCR_DPI = 300
+TESSERACT_CONFIG = "--oem 3 --psm 12"
+REPEATS = 5
+
+SAMPLE_PAGES = 10  # size of the synthetic catalogue; page 1 is OCR'd
+
+
+def sample_page(dpi=OCR_DPI):
+    # Page 1 of the synthetic scanned catalogue (synth_catalogue.py),
+    # thresholded like the OCR scripts do
+    pdf_path = make_catalogue(BENCH_DIR / f"catalogue_{SAMPLE_PAGES}_scan.pdf", SAMPLE_PAGES, image_only=True)
+    with fitz.open(pdf_path) as doc:
+        pix = doc.load_page(0).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+    return np.where(gray > 127, 255, 0).astype(np.uint8)
+
+
+def time_backend(thresh, backend):
+    image_data(thresh, TESSERACT_CONFIG, backend)  # warm-up (model load for tesserocr)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        data = image_data(thresh, TESSERACT_CONFIG, backend)
+    return (time.perf_counter() - start) / REPEATS, data
+
+
+if __name__ == "__main__":
+    thresh = sample_page()
+    print(f"📄 Page {thresh.shape[1]}x{thresh.shape[0]} px, {REPEATS} runs per backend")
+
+    results = {}
+    if shutil.which("tesseract"):
+        results["pytesseract"] = time_backend(thresh, "pytesseract")
+    else:
+        print("⚠️ tesseract executable not found, skipping pytesseract")
+    if tess_api.available():
+        results["tesserocr"] = time_backend(thresh, "tesserocr")
+    else:
+        print("⚠️ tesserocr not installed, skipping tesserocr")
+
+    for backend, (seconds, data) in results.items():
+        words = sum(1 for t in data["text"] if str(t).strip())
+        print(f"⏱️ {backend:12}: {seconds * 1000:8.1f} ms/page, {words} words")
+
+    if len(results) == 2:
+        a = page_lines(results["pytesseract"][1])
+        b = page_lines(results["tesserocr"][1])
+        overhead = results["pytesseract"][0] - results["tesserocr"][0]
+        print(f"🚀 Per-page overhead saved: {overhead * 1000:.1f} ms")
+        print(f"✅ Same lines from both backends: {a == b}")
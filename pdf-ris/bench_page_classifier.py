@@ -0,0 +1,87 @@
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from page_classifier import THUMB_DPI, classify_thumbnail
+from page_source import render_pixmap_gray
+from synth_catalogue import SCAN_DPI, catalogue_entries, draw_page
+
+# ----------------------------
+# BENCHMARK: BLANK / IMAGE PAGE DETECTION
+# ----------------------------
+# page_classifier.classify_thumbnail() on scanned synthetic pages with a
+# known answer: catalogue pages in one and two columns, two entries above
+# a halftone illustration (must stay "text", or their codes are skipped),
+# a full-page halftone plate and an empty page. Prints the kind, ink share
+# and text lines found per page, the time per thumbnail, and whether every
+# page got its expected kind.
+#
+#   python bench_page_classifier.py
+
+HALFTONE_CELL = 6  # pixels per halftone dot at SCAN_DPI
+REPEAT = 5
+
+
+def halftone(width, height, cell=HALFTONE_CELL):
+    # A smooth picture as round halftone dots, like a printed photo
+    yy, xx = np.mgrid[0:height, 0:width]
+    tone = 0.5 + 0.4 * np.sin(xx / 40) * np.cos(yy / 55)
+    dy, dx = yy % cell - cell / 2 + 0.5, xx % cell - cell / 2 + 0.5
+    radius = np.sqrt(dx ** 2 + dy ** 2) / (cell / np.sqrt(2))
+    return np.where(radius < tone, 0, 255).astype(np.uint8)
+
+
+def insert_picture(page, rect):
+    pixels = halftone(int(rect.width * SCAN_DPI / 72), int(rect.height * SCAN_DPI / 72))
+    pix = fitz.Pixmap(fitz.csGRAY, pixels.shape[1], pixels.shape[0], pixels.tobytes(), False)
+    page.insert_image(rect, pixmap=pix)
+
+
+def scanned(page):
+    # The page as an image-only page, like synth_catalogue's scans
+    pix = page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY)
+    doc = fitz.open()
+    scan = doc.new_page(width=page.rect.width, height=page.rect.height)
+    scan.insert_image(scan.rect, pixmap=pix)
+    return doc
+
+
+def sample_pages():
+    # (name, expected kind, one-page document)
+    entries = catalogue_entries(2)
+    doc = fitz.open()
+
+    page = doc.new_page()
+    draw_page(page, entries[0], 1)
+    yield "catalogue, one column", "text", scanned(page)
+
+    page = doc.new_page()
+    draw_page(page, entries[1], 2, columns=2)
+    yield "catalogue, two columns", "text", scanned(page)
+
+    page = doc.new_page()
+    draw_page(page, entries[0][:2], 3)
+    insert_picture(page, fitz.Rect(72, 250, 522, 700))
+    yield "two entries + picture", "text", scanned(page)
+
+    page = doc.new_page()
+    insert_picture(page, page.rect)
+    yield "halftone plate", "image", scanned(page)
+
+    yield "blank", "blank", scanned(doc.new_page())
+
+
+if __name__ == "__main__":
+    all_expected = True
+    print(f"{'page':24} {'expected':>8} {'kind':>6} {'ink':>7} {'lines':>5} {'ms':>6}")
+    for name, expected, doc in sample_pages():
+        gray = render_pixmap_gray(doc.load_page(0), THUMB_DPI)
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            kind, ink_share, lines = classify_thumbnail(gray)
+        ms = (time.perf_counter() - start) * 1000 / REPEAT
+        all_expected &= kind == expected
+        print(f"{name:24} {expected:>8} {kind:>6} {ink_share:7.4f} {lines:5d} {ms:6.1f}"
+              f"{'' if kind == expected else '  ❌'}")
+    print(f"✅ Every page classified as expected: {all_expected}")
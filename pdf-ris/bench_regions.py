@@ -0,0 +1,125 @@
+import shutil
+import sys
+import time
+
+import fitz  # PyMuPDF
+import numpy as np
+
+import tess_api
+from bench_suite import BENCH_DIR
+from blocks import detect_blocks
+from ocr_engine import page_lines, preprocess, thresh_data
+from regions import DATA_COLUMNS, region_data, region_pixels, text_regions
+from synth_catalogue import catalogue_entries, make_catalogue
+
+# ----------------------------
+# BENCHMARK: TEXT REGION CROPPING
+# ----------------------------
+# Share of the page's pixels Tesseract gets with region cropping, and the
+# per-page OCR time with and without it (when a Tesseract backend is
+# installed), on a synthetic catalogue (synth_catalogue.py) or on pages of
+# a given PDF. Then a check that needs no Tesseract: the text layer of the
+# synthetic catalogue, in one and two columns, stands in for the OCR of
+# every crop, and the blocks parsed from the page's lines must keep every
+# code with its own author, as without cropping.
+#
+#   python bench_regions.py [some.pdf first_page last_page]
+
+OCR_DPI = 300
+TESSERACT_CONFIG = "--oem 3 --psm 12"
+
+SAMPLE_PAGES = 3  # pages of the synthetic catalogue measured without a PDF
+
+
+def sample_pages():
+    # The synthetic scanned catalogue (synth_catalogue.py): one column
+    # with the codes at its right edge and a page number at the bottom
+    pdf_path = make_catalogue(BENCH_DIR / f"catalogue_{SAMPLE_PAGES}_scan.pdf", SAMPLE_PAGES, image_only=True)
+    return fitz.open(pdf_path), range(1, SAMPLE_PAGES + 1)
+
+
+def gray_page(doc, page_num):
+    pix = doc.load_page(page_num - 1).get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+
+
+def text_layer_ocr(page, boxes, dpi=OCR_DPI):
+    # ocr(crop) for region_data(): the words of the text layer inside each of
+    # boxes in turn (the crops come in text_regions() order), as an
+    # image_to_data dict in crop pixels
+    scale = dpi / 72
+    words = page.get_text("words")
+    boxes = iter(boxes)
+
+    def ocr(crop):
+        x0, y0, x1, y1 = next(boxes)
+        data = {c: [] for c in DATA_COLUMNS}
+        for wx0, wy0, wx1, wy1, text, block, line, word in words:
+            cx, cy = (wx0 + wx1) / 2 * scale, (wy0 + wy1) / 2 * scale
+            if not (x0 <= cx < x1 and y0 <= cy < y1):
+                continue
+            row = {"level": 5, "page_num": 1, "block_num": block + 1, "par_num": 1, "line_num": line + 1,
+                   "word_num": word + 1, "left": int(wx0 * scale) - x0, "top": int(wy0 * scale) - y0,
+                   "width": int((wx1 - wx0) * scale), "height": int((wy1 - wy0) * scale), "conf": 95,
+                   "text": text}
+            for c in DATA_COLUMNS:
+                data[c].append(row[c])
+        return data
+
+    return ocr
+
+
+def codes_with_authors(pdf_path, pages, entries, cropped):
+    # Share of the entries whose code comes out of detect_blocks() with its
+    # own author (the parser may drop a leading non-ASCII letter)
+    lines = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(1, pages + 1):
+            page = doc.load_page(page_num - 1)
+            thresh = preprocess(gray_page(doc, page_num))
+            boxes = text_regions(thresh, OCR_DPI) if cropped else [(0, 0, thresh.shape[1], thresh.shape[0])]
+            lines.extend(page_lines(region_data(thresh, OCR_DPI, text_layer_ocr(page, boxes)) if cropped
+                                    else text_layer_ocr(page, boxes)(thresh)))
+    blocks = detect_blocks(" ".join(lines))
+    expected = [e for page_entries in entries for e in page_entries]
+    attached = sum(b["code"] == e["code"] and b["author"].strip() != ""
+                   and e["author"].endswith(b["author"].strip()) for b, e in zip(blocks, expected))
+    return attached / len(expected)
+
+
+def time_ocr(thresh, settings):
+    start = time.perf_counter()
+    data = thresh_data(thresh, settings)
+    return time.perf_counter() - start, page_lines(data)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        doc, pages = fitz.open(sys.argv[1]), range(int(sys.argv[2]), int(sys.argv[3]) + 1)
+    else:
+        doc, pages = sample_pages()
+
+    backend = "tesserocr" if tess_api.available() else "pytesseract" if shutil.which("tesseract") else None
+    if backend is None:
+        print("⚠️ No Tesseract backend found, only measuring the cropped pixels")
+
+    for page_num in pages:
+        thresh = preprocess(gray_page(doc, page_num))
+        line = f"📄 page {page_num}: {len(text_regions(thresh, OCR_DPI))} regions, " \
+               f"{region_pixels(thresh, OCR_DPI) * 100:.1f}% of the pixels"
+        if backend:
+            settings = {"dpi": OCR_DPI, "config": TESSERACT_CONFIG, "backend": backend}
+            full, full_lines = time_ocr(thresh, settings)
+            cropped, cropped_lines = time_ocr(thresh, dict(settings, text_regions=True))
+            line += f", {full * 1000:.0f} → {cropped * 1000:.0f} ms ({len(full_lines)} → {len(cropped_lines)} lines)"
+        print(line)
+
+    print("\n🔗 Codes kept with their author (text layer as OCR)")
+    for columns in (1, 2):
+        pdf_path = make_catalogue(BENCH_DIR / f"catalogue_{SAMPLE_PAGES}_text_{columns}col.pdf", SAMPLE_PAGES,
+                                  columns=columns)
+        entries = catalogue_entries(SAMPLE_PAGES)
+        whole = codes_with_authors(pdf_path, SAMPLE_PAGES, entries, cropped=False)
+        cropped = codes_with_authors(pdf_path, SAMPLE_PAGES, entries, cropped=True)
+        print(f"   {columns} column(s): whole page {whole:6.1%}, regions {cropped:6.1%}")
+        print(f"✅ Same as without cropping: {cropped == whole}")
@@ -0,0 +1,69 @@
+import shutil
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import numpy as np
+
+from bench_suite import BENCH_DIR
+from ocr_engine import preprocess
+from page_source import iter_rendered
+from synth_catalogue import make_catalogue
+
+# ----------------------------
+# BENCHMARK: PAGE RENDERING TO THRESHOLD
+# ----------------------------
+# Per-page latency and traced allocations from rendering up to the
+# thresholded page, for each renderer in page_source.RENDERERS. An
+# RGB PyMuPDF path is included as a stand-in for the old RGB route when
+# poppler is not installed. Without a PDF it renders a synthetic scanned
+# catalogue (synth_catalogue.py).
+#
+#   python bench_render.py [some.pdf]
+
+OCR_DPI = 300
+PAGES = 5
+
+
+def pymupdf_rgb_pages(pdf_path, dpi, pages):
+    # The old route with PyMuPDF instead of poppler: RGB pixmap -> PIL-like copy -> gray
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(1, min(pages, doc.page_count) + 1):
+            pix = doc.load_page(page_num - 1).get_pixmap(dpi=dpi)
+            yield page_num, np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+
+
+def measure(pages):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = 0
+    for _, page in pages:
+        preprocess(page)
+        count += 1
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        pdf_path = Path(sys.argv[1])
+    else:
+        pdf_path = make_catalogue(BENCH_DIR / f"catalogue_{PAGES}_scan.pdf", PAGES, image_only=True)
+
+    routes = {"pymupdf_rgb (old route)": lambda: pymupdf_rgb_pages(pdf_path, OCR_DPI, PAGES)}
+    if shutil.which("pdftoppm"):
+        routes["poppler (RGB)"] = lambda: iter_rendered(pdf_path, OCR_DPI, 1, PAGES, renderer="poppler")
+        routes["poppler_gray"] = lambda: iter_rendered(pdf_path, OCR_DPI, 1, PAGES, renderer="poppler_gray")
+    else:
+        print("⚠️ pdftoppm not found, skipping the poppler renderers")
+    routes["pymupdf_gray"] = lambda: iter_rendered(pdf_path, OCR_DPI, 1, PAGES, renderer="pymupdf_gray")
+
+    print(f"📄 {pdf_path.name} at {OCR_DPI} DPI")
+    print(f"{'renderer':26} {'ms/page':>9} {'peak traced MB':>15}")
+    for name, pages in routes.items():
+        count, seconds, peak = measure(pages())
+        print(f"{name:26} {seconds * 1000 / count:9.1f} {peak / 1024 / 1024:15.1f}")
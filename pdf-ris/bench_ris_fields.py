@@ -0,0 +1,105 @@
+import re
+import sys
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from ris_extract import FIELD_PATTERNS, detect_ris_type
+
+# ----------------------------
+# BENCHMARK: RIS FIELD SCANNING
+# ----------------------------
+# extract_ris_entry() runs one search per field (plus up to four in
+# detect_ris_type). This compares that with a single-pass scanner: one
+# combined alternation that finds every keyword position in one go, after
+# which each field's own pattern is only tried at its keyword positions.
+# Both must give the same fields; the text extraction time is printed for
+# scale.
+#
+#   python bench_ris_fields.py [folder with PDFs ...]
+
+REPEATS = 20
+FOLDERS = [Path("samples/v0"), Path("../import")]
+
+# One group per keyword kind; every kind starts with a different (folded)
+# character sequence, so at most one kind matches at a position. The
+# lookahead keeps the scan zero-width, so overlapping keywords (a year
+# inside a DOI) are all found.
+KEYWORDS = {
+    "conf": r'(?i:Proceedings of|Conference)',
+    "journal": r'(?i:Journal)',
+    "thesis": r'(?i:Thesis|Dissertation)',
+    "book": r'(?i:Book|Publisher)',
+    "published": r'(?i:Published by)',
+    "abstract": r'(?i:Abstract)',
+    "keywords": r'(?i:Key\s*words?)',
+    "doi": r'10\.\d{4,9}/',
+    "year": r'\b20\d{2}\b',
+}
+SCANNER = re.compile("(?=" + "|".join(f"(?P<{kind}>{p})" for kind, p in KEYWORDS.items()) + ")")
+
+FIELD_KEYWORDS = {
+    "conf": ("conf",),
+    "doi": ("doi",),
+    "abstract": ("abstract",),
+    "keywords": ("keywords",),
+    "venue": ("conf", "journal"),
+    "publisher": ("published",),
+    "year": ("year",),
+}
+RIS_TYPES = (("conf", "CONF"), ("journal", "JOUR"), ("thesis", "THES"), ("book", "BOOK"))
+
+
+def per_field(text):
+    matches = {name: pattern.search(text) for name, pattern in FIELD_PATTERNS.items()}
+    return detect_ris_type(text), matches
+
+
+def single_pass(text):
+    hits = {kind: [] for kind in KEYWORDS}
+    for m in SCANNER.finditer(text):
+        hits[m.lastgroup].append(m.start())
+
+    matches = {}
+    for name, kinds in FIELD_KEYWORDS.items():
+        positions = sorted(p for kind in kinds for p in hits[kind])
+        pattern = FIELD_PATTERNS[name]
+        matches[name] = next((m for m in (pattern.match(text, p) for p in positions) if m), None)
+
+    ris_type = next((ris for kind, ris in RIS_TYPES if hits[kind]), "GEN")
+    return ris_type, matches
+
+
+def fields(result):
+    ris_type, matches = result
+    return ris_type, {name: m and (m.span(), m.groups()) for name, m in matches.items()}
+
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / REPEATS / len(texts)
+
+
+if __name__ == "__main__":
+    folders = [Path(f) for f in sys.argv[1:]] or FOLDERS
+    pdf_files = sorted(f for folder in folders for f in folder.rglob("*.pdf"))
+    if not pdf_files:
+        sys.exit("❌ No PDFs found")
+
+    start = time.perf_counter()
+    texts = []
+    for pdf_file in pdf_files:
+        with fitz.open(pdf_file) as doc:
+            texts.append("\n".join(page.get_text() for page in doc))
+    extract_seconds = (time.perf_counter() - start) / len(texts)
+
+    same = all(fields(per_field(t)) == fields(single_pass(t)) for t in texts)
+    print(f"📄 {len(texts)} PDFs, {sum(map(len, texts)) // len(texts)} characters each on average")
+    print(f"⏱️ get_text (for scale): {extract_seconds * 1000:8.3f} ms/paper")
+    print(f"⏱️ per-field searches  : {timed(per_field, texts) * 1000:8.3f} ms/paper")
+    print(f"⏱️ single-pass scanner : {timed(single_pass, texts) * 1000:8.3f} ms/paper")
+    print(f"✅ Same fields from both: {same}")
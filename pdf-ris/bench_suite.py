@@ -0,0 +1,161 @@
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+import tess_api
+from blocks import detect_blocks
+from layout import extract_blocks
+from ocr_engine import page_lines, preprocess, thresh_data
+from page_source import iter_rendered
+from synth_catalogue import ENTRIES_PER_PAGE, SCAN_DPI, make_catalogue, ocr_like_text
+from text_layer import classify_pages
+
+# ----------------------------
+# BENCHMARK SUITE
+# ----------------------------
+# Pages per second, per-stage latency and peak traced memory of
+#   layout       main03's PyMuPDF block path (layout.extract_blocks)
+#   text_layer   the hybrid reader's text-layer pass (text_layer.classify_pages)
+#   ocr          main07's OCR path, stage by stage: render, threshold, OCR,
+#                line grouping (OCR only when a Tesseract backend is installed)
+#   blocks       the block parser (blocks.detect_blocks) on OCR-like text
+# on synthetic catalogues (synth_catalogue.py) of every size in SIZES, as
+# text-layer and image-only PDFs. Runs offline; the generated PDFs are kept
+# in BENCH_DIR for the next run. Results go to BENCH_OUTPUT as JSON.
+#
+#   python bench_suite.py [size ...]
+
+SIZES = [10, 100, 1000, 5000]
+OCR_MAX_PAGES = 20  # the OCR path only runs on the first pages of each PDF
+OCR_DPI = 300
+TESSERACT_CONFIG = "--oem 3 --psm 12"
+LAYOUT_WORKERS = [1, 4]
+
+BENCH_DIR = Path(tempfile.gettempdir()) / "pdfreader_bench"
+BENCH_OUTPUT = Path("bench_results.json")
+
+
+def measure(fn):
+    # Runs fn() and returns (result, seconds, peak traced MB)
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak / 1024 / 1024
+
+
+def record(results, bench, pages, seconds, peak_mb, **extra):
+    row = {
+        "bench": bench,
+        "pages": pages,
+        "seconds": round(seconds, 4),
+        "pages_per_s": round(pages / seconds, 2) if seconds else None,
+        "peak_mb": round(peak_mb, 1),
+        **extra,
+    }
+    results.append(row)
+    print(f"  {bench:28} {pages:6} pages {row['seconds']:9.3f} s "
+          f"{row['pages_per_s'] or 0:9.1f} pages/s {row['peak_mb']:8.1f} MB")
+
+
+def bench_layout(results, pdf_path, pages):
+    for workers in LAYOUT_WORKERS:
+        blocks, seconds, peak = measure(lambda: extract_blocks(pdf_path, 0, pages - 1, workers=workers))
+        record(results, f"layout (workers={workers})", pages, seconds, peak, blocks=len(blocks))
+
+
+def bench_text_layer(results, pdf_path, pages, kind):
+    (text_pages, _), seconds, peak = measure(lambda: classify_pages(pdf_path, range(1, pages + 1), OCR_DPI))
+    record(results, f"text_layer ({kind})", pages, seconds, peak, text_layer_pages=len(text_pages))
+
+
+def bench_ocr(results, pdf_path, pages, backend):
+    # Stage by stage on the same pages, so the latencies add up to the run
+    pages = min(pages, OCR_MAX_PAGES)
+    settings = {"dpi": OCR_DPI, "config": TESSERACT_CONFIG, "backend": backend}
+    stages = {"render": 0.0, "threshold": 0.0, "ocr": 0.0, "line_grouping": 0.0}
+    lines = 0
+
+    def run():
+        nonlocal lines
+        rendered = iter_rendered(pdf_path, OCR_DPI, 1, pages, renderer="pymupdf_gray")
+        while True:
+            start = time.perf_counter()
+            item = next(rendered, None)
+            stages["render"] += time.perf_counter() - start
+            if item is None:
+                break
+
+            start = time.perf_counter()
+            thresh = preprocess(item[1])
+            stages["threshold"] += time.perf_counter() - start
+            if not backend:
+                continue
+
+            start = time.perf_counter()
+            data = thresh_data(thresh, settings)
+            stages["ocr"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            lines += len(page_lines(data))
+            stages["line_grouping"] += time.perf_counter() - start
+
+    _, seconds, peak = measure(run)
+    latency = {f"{stage}_ms_per_page": round(s * 1000 / pages, 2) for stage, s in stages.items()}
+    record(results, f"ocr ({backend or 'render+threshold only'})", pages, seconds, peak,
+           lines=lines, **latency)
+
+
+def bench_blocks(results, pages):
+    text = ocr_like_text(pages)
+    blocks, seconds, peak = measure(lambda: detect_blocks(text))
+    record(results, "blocks", pages, seconds, peak, characters=len(text), blocks=len(blocks),
+           expected_blocks=pages * ENTRIES_PER_PAGE)
+
+
+def main(sizes):
+    backend = "tesserocr" if tess_api.available() else "pytesseract" if shutil.which("tesseract") else None
+    if backend is None:
+        print("⚠️ No Tesseract backend found, the OCR bench only covers render + threshold")
+
+    results = []
+    for pages in sizes:
+        print(f"\n📄 {pages} pages")
+        text_pdf = make_catalogue(BENCH_DIR / f"catalogue_{pages}_text.pdf", pages)
+        scan_pdf = make_catalogue(BENCH_DIR / f"catalogue_{pages}_scan.pdf", pages, image_only=True)
+
+        bench_layout(results, text_pdf, pages)
+        bench_text_layer(results, text_pdf, pages, "text-layer PDF")
+        bench_text_layer(results, scan_pdf, pages, "image-only PDF")
+        bench_ocr(results, scan_pdf, pages, backend)
+        bench_blocks(results, pages)
+        for row in results:
+            row.setdefault("size", pages)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pymupdf": fitz.VersionBind,
+        "ocr_backend": backend,
+        "ocr_dpi": OCR_DPI,
+        "scan_dpi": SCAN_DPI,
+        "results": results,
+    }
+    BENCH_OUTPUT.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n📊 Results saved to: {BENCH_OUTPUT}")
+
+
+# Layout workers re-import this script on Windows
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or SIZES)
@@ -0,0 +1,73 @@
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench_line_grouping import synthetic_page
+from ocr_engine import page_lines
+from word_store import WordStore
+
+# ----------------------------
+# BENCHMARK: WORD STORE
+# ----------------------------
+# Memory of keeping the word-level output of a whole document as the
+# image_to_data dicts (lists of Python ints and strings) versus the columnar
+# word_store.WordStore, plus save / load / re-grouping times. Uses the
+# synthetic dense pages of bench_line_grouping.py.
+#
+#   python bench_word_store.py [pages]
+
+PAGES = 1000
+
+
+def traced(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, current / 1024 / 1024
+
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else PAGES
+    rng = random.Random(0)
+
+    dicts, dict_s, dict_mb = traced(lambda: [synthetic_page(rng) for _ in range(pages)])
+    rows = sum(len(d["text"]) for d in dicts)
+
+    def build():
+        store = WordStore(300)
+        for page_num, data in enumerate(dicts, start=1):
+            store.add_page(page_num, data)
+        store.nbytes()  # finishes the columns
+        return store
+
+    store, build_s, store_mb = traced(build)
+    print(f"📄 {pages} pages, {rows} image_to_data rows, {len(store.columns['text'])} words, "
+          f"{len(store.pool_offsets) - 1} distinct")
+    print(f"🐢 dicts      : {dict_mb:8.1f} MB")
+    print(f"🚀 word store : {store_mb:8.1f} MB ({dict_mb / store_mb:.0f}x less), built in {build_s:.2f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "words"
+        start = time.perf_counter()
+        store.save(folder)
+        save_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = WordStore.load(folder)
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lines = [page_lines(data) for _, data in loaded.iter_pages(min_conf=50)]
+        regroup_s = time.perf_counter() - start
+        same = lines == [page_lines({**d, "conf": [c if c >= 50 else -1 for c in d["conf"]]}) for d in dicts]
+        del loaded
+
+    print(f"💾 save {save_s:.2f} s, load (memory-mapped) {load_s * 1000:.1f} ms, "
+          f"re-group at conf ≥ 50 {regroup_s:.2f} s")
+    print(f"✅ Same lines as from the dicts: {same}")
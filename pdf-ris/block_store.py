@@ -0,0 +1,180 @@
+import re
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ocr_cache import file_hash
+
+# ----------------------------
+# SQLITE BLOCK STORE
+# ----------------------------
+# Optional output backend next to _blocks.txt / _blocks.csv: the blocks of
+# any number of catalogues in one SQLite file, with
+#   a B-tree index on the normalized shelf code ("8341 E 18" -> "8341E18")
+#   an FTS5 index on author, title and text
+# so a code or full-text lookup over all catalogues doesn't re-read and
+# re-parse every CSV. A catalogue is keyed on its PDF hash and source
+# ("main07", "main03", ...): writing it again replaces its blocks. Blocks are
+# inserted in transactions of BATCH_SIZE rows. page, bbox and provenance are
+# filled where the pipeline knows them and NULL otherwise.
+#
+#   python block_store.py catalogue.sqlite code "8341 E 18"
+#   python block_store.py catalogue.sqlite search "litterature europeenne"
+
+BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalogues (
+    id INTEGER PRIMARY KEY,
+    pdf TEXT NOT NULL,
+    pdf_hash TEXT NOT NULL,
+    source TEXT NOT NULL,
+    blocks INTEGER NOT NULL DEFAULT 0,
+    created TEXT NOT NULL,
+    UNIQUE (pdf_hash, source)
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    id INTEGER PRIMARY KEY,
+    catalogue_id INTEGER NOT NULL REFERENCES catalogues(id),
+    seq INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    code_norm TEXT NOT NULL,
+    author TEXT,
+    title TEXT,
+    text TEXT,
+    page INTEGER,
+    x0 REAL, y0 REAL, x1 REAL, y1 REAL,
+    provenance TEXT
+);
+CREATE INDEX IF NOT EXISTS blocks_code ON blocks (code_norm);
+CREATE INDEX IF NOT EXISTS blocks_catalogue ON blocks (catalogue_id, seq);
+"""
+
+# External-content FTS table: the text lives in `blocks` only. Accents are
+# folded, so "europeenne" also finds "EUROPÉENNE".
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS blocks_fts USING fts5(
+    author, title, text, content='blocks', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+BLOCK_COLUMNS = ["seq", "code", "code_norm", "author", "title", "text", "page", "x0", "y0", "x1", "y1",
+                 "provenance"]
+
+
+def normalize_code(code):
+    # "8341 E 18", "8341E18" and "8341 e 18" are the same shelf code
+    return re.sub(r"\s+", "", code).upper()
+
+
+class BlockStore:
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search() falls back to LIKE
+            print("⚠️ SQLite has no FTS5, full-text search will scan the blocks")
+            self.fts = False
+
+    def _row(self, seq, block, provenance):
+        bbox = block.get("bbox") or (None, None, None, None)
+        return (seq, block["code"], normalize_code(block["code"]), block.get("author"), block.get("title"),
+                block.get("text"), block.get("page"), *bbox, block.get("provenance", provenance))
+
+    def write_catalogue(self, pdf_path, blocks, source, batch_size=BATCH_SIZE):
+        # Replaces the blocks of this PDF + source; returns the catalogue id
+        pdf_hash = file_hash(pdf_path)
+        with self.conn:
+            old = self.conn.execute("SELECT id FROM catalogues WHERE pdf_hash = ? AND source = ?",
+                                    (pdf_hash, source)).fetchone()
+            if old:
+                if self.fts:
+                    self.conn.execute(
+                        "INSERT INTO blocks_fts (blocks_fts, rowid, author, title, text) "
+                        "SELECT 'delete', id, author, title, text FROM blocks WHERE catalogue_id = ?",
+                        (old["id"],))
+                self.conn.execute("DELETE FROM blocks WHERE catalogue_id = ?", (old["id"],))
+                self.conn.execute("DELETE FROM catalogues WHERE id = ?", (old["id"],))
+            catalogue_id = self.conn.execute(
+                "INSERT INTO catalogues (pdf, pdf_hash, source, created) VALUES (?, ?, ?, ?)",
+                (Path(pdf_path).name, pdf_hash, source,
+                 datetime.now(timezone.utc).isoformat(timespec="seconds"))).lastrowid
+
+        insert = (f"INSERT INTO blocks (catalogue_id, {', '.join(BLOCK_COLUMNS)}) "
+                  f"VALUES ({catalogue_id}{', ?' * len(BLOCK_COLUMNS)})")
+        for start in range(0, len(blocks), batch_size):
+            batch = blocks[start:start + batch_size]
+            rows = [self._row(start + n, block, source) for n, block in enumerate(batch)]
+            with self.conn:
+                self.conn.executemany(insert, rows)
+                if self.fts:
+                    self.conn.execute(
+                        "INSERT INTO blocks_fts (rowid, author, title, text) "
+                        "SELECT id, author, title, text FROM blocks WHERE catalogue_id = ? AND seq >= ?",
+                        (catalogue_id, start))
+
+        with self.conn:
+            self.conn.execute("UPDATE catalogues SET blocks = ? WHERE id = ?", (len(blocks), catalogue_id))
+        return catalogue_id
+
+    def find_code(self, code, prefix=False):
+        # Blocks with this shelf code (or, with prefix=True, codes starting
+        # with it: "8341 E" finds "8341 E 18" and "8341 E 20-01")
+        code = normalize_code(code)
+        if prefix:
+            # A range on the index instead of LIKE, which can't use it here
+            where, args = "b.code_norm >= ? AND b.code_norm < ?", (code, code + "\uffff")
+        else:
+            where, args = "b.code_norm = ?", (code,)
+        rows = self.conn.execute(
+            f"SELECT c.pdf, b.* FROM blocks b JOIN catalogues c ON c.id = b.catalogue_id "
+            f"WHERE {where} ORDER BY b.code_norm, c.pdf, b.seq", args)
+        return [dict(row) for row in rows]
+
+    def search(self, query, limit=50):
+        # Full-text search over author, title and text, best matches first.
+        # query is FTS5 syntax: words, "phrases", prefix*, author:name, OR, NOT
+        if not self.fts:
+            pattern = f"%{query}%"
+            rows = self.conn.execute(
+                "SELECT c.pdf, b.* FROM blocks b JOIN catalogues c ON c.id = b.catalogue_id "
+                "WHERE b.author LIKE ? OR b.title LIKE ? OR b.text LIKE ? LIMIT ?",
+                (pattern, pattern, pattern, limit))
+            return [dict(row) for row in rows]
+        rows = self.conn.execute(
+            "SELECT c.pdf, b.* FROM blocks_fts f JOIN blocks b ON b.id = f.rowid "
+            "JOIN catalogues c ON c.id = b.catalogue_id "
+            "WHERE blocks_fts MATCH ? ORDER BY f.rank LIMIT ?", (query, limit))
+        return [dict(row) for row in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def main(args):
+    if len(args) != 3 or args[1] not in ("code", "search"):
+        print('Usage: python block_store.py <db> code "8341 E 18" | search "words"')
+        return
+    store = BlockStore(args[0])
+    if args[1] == "code":
+        # An incomplete code ("8341 E") lists every code starting with it
+        rows = store.find_code(args[2]) or store.find_code(args[2], prefix=True)
+    else:
+        rows = store.search(args[2])
+    for row in rows:
+        page = f" p.{row['page']}" if row["page"] is not None else ""
+        print(f"📚 {row['pdf']}{page}  {row['code']}  {row['author']}  {row['title']}\n   {row['text'][:160]}")
+    print(f"🔎 {len(rows)} blocks")
+    store.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,118 @@
+import re
+
+from instrument import stage
+
+# ----------------------------
+# CATALOGUE BLOCK DETECTION
+# ----------------------------
+# Splits the OCR text of a catalogue into blocks around the shelf codes:
+#
+#   AUTHOR, A. B.* 8341 E 18 TITLE IN CAPITALS Description ... NEXT, AUTHOR * 8337 F 28 ...
+#                  ^ code    ^ title           ^ text
+#
+# The author is the run of uppercase/punctuation characters right before a
+# code. It used to be found with
+#   re.findall(r'([A-Z ,.\-\'*]+)[\.\*]?$', ocr_text[:match.start()].rstrip())
+# which copies and rescans the whole text before every code (quadratic in the
+# length of the catalogue). find_author() walks backwards from the code
+# instead and stops at the first character outside that class, which gives
+# the same match in time proportional to the author itself.
+
+code_pattern = re.compile(r"(83\d{2}\s?[A-Za-z]{1,2}\s?\d{2}(?:-\d{2})?|Leeszaal)")
+
+AUTHOR_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ ,.-'*")
+
+
+# ----------------------------
+# AUTHOR LOOKBEHIND
+# ----------------------------
+def author_span(text, end):
+    # (start, end) of the author run before position `end`
+    # Skip the whitespace rstrip() used to remove
+    while end > 0 and text[end - 1].isspace():
+        end -= 1
+
+    start = end
+    while start > 0 and text[start - 1] in AUTHOR_CHARS:
+        start -= 1
+
+    return start, end
+
+
+def find_author(text, end):
+    start, end = author_span(text, end)
+    return text[start:end].strip()
+
+
+# ----------------------------
+# TITLE EXTRACTION
+# ----------------------------
+def extract_title(block_text, threshold=0.7):
+    words = block_text.split()
+    title_words = []
+
+    for w in words:
+        # Keep only letters for ratio check
+        letters = re.findall(r'[A-Za-z]', w)
+        if not letters:
+            break  # stop if word has no letters
+
+        # Count uppercase letters
+        upper_count = sum(1 for c in letters if c.isupper())
+        ratio = upper_count / len(letters)
+
+        if ratio >= threshold:
+            title_words.append(w)
+        else:
+            break
+
+    return " ".join(title_words).strip()
+
+
+# ----------------------------
+# BLOCK DETECTION
+# ----------------------------
+def detect_blocks(ocr_text):
+    matches = list(code_pattern.finditer(ocr_text))
+    blocks = []
+
+    for i, match in enumerate(matches):
+        code = match.group()
+
+        # Block text
+        start_idx = match.end()
+        end_idx = matches[i + 1].start() if i + 1 < len(matches) else len(ocr_text)
+        block_text = ocr_text[start_idx:end_idx].strip()
+
+        # Find author: last uppercase sequence before code
+        author = find_author(ocr_text, match.start())
+
+        # --- AUTHOR CORRECTION ---
+        author = re.sub(r'^[^A-Z]+', '', author)
+        author = re.sub(r'[.\*]+$', '', author)
+
+        # --- SUBTRACT AUTHOR FROM PREVIOUS BLOCK ---
+        if i > 0 and author:
+            prev_block = blocks[-1]
+            # Regex removes trailing whitespace/punctuation plus the author
+            pattern = re.escape(author) + r'[\s\.\*]*$'
+            prev_block["text"] = re.sub(pattern, '', prev_block["text"]).rstrip()
+
+        # Extract title
+        with stage("title_extraction"):
+            title = extract_title(block_text)
+
+        # --- REMOVE TITLE FROM START OF BLOCK TEXT ---
+        if title:
+            title_pattern = re.escape(title) + r'[\s\.\*]*'
+            block_text = re.sub(r'^' + title_pattern, '', block_text, count=1).strip()
+
+        # Append current block
+        blocks.append({
+            "code": code,
+            "author": author,
+            "title": title,
+            "text": block_text
+        })
+
+    return blocks
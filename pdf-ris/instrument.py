@@ -0,0 +1,200 @@
+import json
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+try:
+    import resource  # peak RSS, not available on Windows
+except ImportError:
+    resource = None
+
+# ----------------------------
+# STAGE INSTRUMENTATION
+# ----------------------------
+# Records wall time, CPU time (of the calling thread) and optionally the
+# peak traced memory of every stage, per page where there is one:
+#
+#   with stage("threshold", page_num):
+#       thresh = preprocess(page)
+#
+# Stages nest (block_detection > title_extraction) and every thread has its
+# own stack, so the pipeline's render / preprocess / OCR threads show up
+# separately. Nothing is recorded until enable() is called, and stage() is a
+# no-op then. At the end write_report() gives a JSON run report (stage totals,
+# per-page wall/CPU time and peak memory, slowest pages) and write_folded()
+# a profile in the folded stack format that flamegraph.pl and speedscope read.
+#
+# CPU time is that of the Python process: Tesseract via pytesseract runs in
+# its own process and only shows up as wall time. With OCR_WORKERS > 1 the
+# pages are handled in other processes, so only the wait per page is
+# recorded. Per-stage memory (trace_memory=True, slower) is exact when
+# stages don't run concurrently.
+
+_recorder = None
+
+
+class Recorder:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []  # (path, page, wall, self wall, cpu, peak bytes)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @contextmanager
+    def stage(self, name, page=None):
+        stack = self._stack()
+        frame = {"name": name, "page": page, "children": 0.0, "child_peak": 0}
+        stack.append(frame)
+        if self.trace_memory:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield frame
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            peak = 0
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["child_peak"])
+
+            path = (threading.current_thread().name,) + tuple(f["name"] for f in stack)
+            stack.pop()
+            if stack:
+                stack[-1]["children"] += wall
+                stack[-1]["child_peak"] = max(stack[-1]["child_peak"], peak)
+
+            mem = max(0, peak - base) if self.trace_memory else 0
+            with self.lock:
+                self.records.append((path, frame["page"], wall, wall - frame["children"], cpu, mem))
+
+    def stage_totals(self):
+        totals = defaultdict(lambda: {"count": 0, "wall_s": 0.0, "self_s": 0.0, "cpu_s": 0.0,
+                                      "max_ms": 0.0, "peak_mem_mb": 0.0})
+        for path, _, wall, self_wall, cpu, mem in self.records:
+            t = totals[";".join(path)]
+            t["count"] += 1
+            t["wall_s"] += wall
+            t["self_s"] += self_wall
+            t["cpu_s"] += cpu
+            t["max_ms"] = max(t["max_ms"], wall * 1000)
+            t["peak_mem_mb"] = max(t["peak_mem_mb"], mem / 1024 / 1024)
+
+        rows = []
+        for path, t in sorted(totals.items(), key=lambda item: -item[1]["wall_s"]):
+            rows.append({
+                "stage": path,
+                "count": t["count"],
+                "wall_s": round(t["wall_s"], 4),
+                "self_s": round(t["self_s"], 4),
+                "cpu_s": round(t["cpu_s"], 4),
+                "mean_ms": round(t["wall_s"] * 1000 / t["count"], 3),
+                "max_ms": round(t["max_ms"], 3),
+                "peak_mem_mb": round(t["peak_mem_mb"], 2) if self.trace_memory else None,
+            })
+        return rows
+
+    def page_totals(self):
+        # Wall and CPU time per page (summed over its stages) and, with
+        # trace_memory, the highest peak of any of its stages
+        pages = defaultdict(lambda: {"stages": {}, "cpu_ms": 0.0, "peak_mem": 0})
+        for path, page, wall, _, cpu, mem in self.records:
+            if page is None:
+                continue
+            totals = pages[page]
+            stages = totals["stages"]
+            stages[path[-1]] = stages.get(path[-1], 0.0) + wall * 1000
+            totals["cpu_ms"] += cpu * 1000
+            totals["peak_mem"] = max(totals["peak_mem"], mem)
+
+        rows = []
+        for page in sorted(pages):
+            totals = pages[page]
+            stages = {name: round(ms, 2) for name, ms in totals["stages"].items()}
+            rows.append({
+                "page": page,
+                "wall_ms": round(sum(stages.values()), 2),
+                "cpu_ms": round(totals["cpu_ms"], 2),
+                "peak_mem_mb": round(totals["peak_mem"] / 1024 / 1024, 2) if self.trace_memory else None,
+                "stages": stages,
+            })
+        return rows
+
+    def report(self, slowest=10):
+        pages = self.page_totals()
+        peak_rss_mb = None
+        if resource is not None:
+            # ru_maxrss is in KB on Linux
+            peak_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        return {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "peak_rss_mb": peak_rss_mb,
+            "traced_memory": self.trace_memory,
+            "stages": self.stage_totals(),
+            "slowest_pages": sorted(pages, key=lambda p: -p["wall_ms"])[:slowest],
+            "pages": pages,
+        }
+
+    def folded(self):
+        # "thread;stage;substage <self time in microseconds>" per stack
+        self_us = defaultdict(float)
+        for path, _, _, self_wall, _, _ in self.records:
+            self_us[";".join(path)] += self_wall * 1e6
+        return "".join(f"{path} {round(us)}\n" for path, us in sorted(self_us.items()) if round(us) > 0)
+
+
+def enable(trace_memory=False):
+    global _recorder
+    _recorder = Recorder(trace_memory)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+def stage(name, page=None):
+    if _recorder is None:
+        return nullcontext()
+    return _recorder.stage(name, page)
+
+
+def timed_pages(pages, name):
+    # Passes (page_num, ...) items through, recording the time it takes to
+    # produce each one as stage `name` of that page
+    if _recorder is None:
+        yield from pages
+        return
+    items = iter(pages)
+    while True:
+        with _recorder.stage(name) as frame:
+            item = next(items, None)
+            if item is not None:
+                frame["page"] = item[0]
+        if item is None:
+            return
+        yield item
+
+
+def write_report(path, folded_path=None):
+    # Writes the JSON run report (and the folded profile); returns the report
+    if _recorder is None:
+        return None
+    report = _recorder.report()
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if folded_path:
+        folded_path.write_text(_recorder.folded(), encoding="utf-8")
+    return report
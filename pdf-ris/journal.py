@@ -0,0 +1,65 @@
+import json
+import os
+from pathlib import Path
+
+from ocr_cache import file_hash, ocr_settings_key
+
+# ----------------------------
+# PAGE JOURNAL
+# ----------------------------
+# An append-only JSON-lines file per OCR job: a header with the PDF hash
+# and OCR settings, then one {"page": n, "lines": [...]} record per finished
+# page, flushed and fsynced before the next page starts. After a crash or
+# reboot the job re-opens the journal, keeps every complete record (a
+# half-written last line is cut off) and only OCRs the pages that are not
+# in it yet. Extending the page range (e.g. last_page=341 -> the whole
+# book) therefore only OCRs the new pages. A journal written for another
+# PDF or other settings is moved aside to <name>.old and started over.
+
+
+class PageJournal:
+    def __init__(self, path, pdf_path, settings):
+        self.path = Path(path)
+        self.header = {"pdf": file_hash(pdf_path), **ocr_settings_key(settings)}
+        self.pages = {}
+        self._load()
+        self.file = self.path.open("a", encoding="utf-8")
+        if self.path.stat().st_size == 0:
+            self._write(self.header)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        raw = self.path.read_bytes()
+        # Everything after the last newline is a record that was cut off
+        good = raw[:raw.rfind(b"\n") + 1]
+        records = [json.loads(line) for line in good.decode("utf-8").splitlines() if line.strip()]
+
+        if not records or records[0] != self.header:
+            self.path.replace(self.path.with_name(self.path.name + ".old"))
+            print(f"📓 Journal {self.path.name} was for another PDF or other settings, starting a new one")
+            return
+        if len(good) < len(raw):
+            with self.path.open("r+b") as f:
+                f.truncate(len(good))
+        for record in records[1:]:
+            self.pages[record["page"]] = record["lines"]
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def missing(self, page_numbers):
+        return [p for p in page_numbers if p not in self.pages]
+
+    def append(self, page_num, lines):
+        self._write({"page": page_num, "lines": lines})
+        self.pages[page_num] = lines
+
+    def lines(self, page_numbers):
+        # All lines of the given pages, in page order
+        return [line for p in page_numbers for line in self.pages.get(p, [])]
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,225 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# ----------------------------
+# PYMUPDF BLOCK LAYOUT
+# ----------------------------
+# The per-page part of main02.py / main03.py: text blocks sorted top to
+# bottom, grouped by vertical proximity, and catalogue codes attached to the
+# entry they belong to. Pages are independent of each other (leftover codes
+# go to the last entry of their own page), so a page range can be split into
+# shards that are handled by separate worker processes and joined in order.
+#
+# Two engines group the blocks:
+#   "loop"   group_blocks(): sort with a key function, walk the blocks (default)
+#   "numpy"  group_pages(): the coordinates of every block of the page range
+#            as arrays, one lexsort, the vertical gaps and group ids computed
+#            with array operations. Same groups as the loop.
+# With columns=True (numpy engine only) every page is first split into
+# columns at empty vertical strips (page_columns()), and blocks are grouped
+# column by column, so the entries of two-column pages are not interleaved.
+
+code_pattern = re.compile(r"\b(83\d{2}\s?[A-Z]\s?\d{2}(?:-\d{2})?|Leeszaal)\b")
+code_strip_pattern = re.compile(r"\s*\b(83\d{2}\s?[A-Z]\s?\d{2}(?:-\d{2})?|Leeszaal)\b\s*")
+
+GROUP_THRESHOLD = 2  # vertical gap (in points)
+
+# Column detection
+MIN_GUTTER_PT = 12       # narrowest empty vertical strip between two columns
+MIN_COLUMN_SHARE = 0.2   # every column holds at least this share of the page's characters
+MIN_GUTTER_CHARS = 8     # shorter blocks (page numbers, marks) may sit in a gutter
+WIDE_BLOCK_SHARE = 0.6   # wider blocks (headers across columns) may cross a gutter
+
+
+def group_blocks(raw_blocks, threshold=GROUP_THRESHOLD):
+    raw_blocks.sort(key=lambda b: (b[1], b[0]))  # sort top to bottom, left to right
+
+    grouped_blocks = []
+    current_group = []
+    last_y1 = None
+
+    for b in raw_blocks:
+        text = b[4].strip()
+        if not text:
+            continue
+        y0, y1 = b[1], b[3]
+
+        if last_y1 is None or (y0 - last_y1) > threshold:
+            if current_group:
+                grouped_blocks.append(" ".join(current_group))
+            current_group = [text]
+        else:
+            current_group.append(text)
+        last_y1 = y1
+
+    if current_group:
+        grouped_blocks.append(" ".join(current_group))
+    return grouped_blocks
+
+
+def attach_codes(grouped_blocks):
+    results = []
+    pending_codes = []
+
+    for text in grouped_blocks:
+        text = text.strip()
+
+        # --- Inline codes ---
+        inline_codes = code_pattern.findall(text)
+        if inline_codes and not code_pattern.fullmatch(text):
+            clean_text = code_strip_pattern.sub("", text).strip()
+            all_codes = pending_codes + inline_codes
+            pending_codes = []
+            if clean_text:
+                results.append(clean_text + "\n" + "\n".join(all_codes))
+            else:
+                results.append("\n".join(all_codes))
+            continue
+
+        # --- Code-only block ---
+        if code_pattern.fullmatch(text):
+            pending_codes.append(text)
+            continue
+
+        # --- Regular text block ---
+        if pending_codes:
+            text = text + "\n" + "\n".join(pending_codes)
+            pending_codes = []
+        results.append(text)
+
+    # Attach any leftover codes
+    if pending_codes and results:
+        results[-1] += "\n" + "\n".join(pending_codes)
+    return results
+
+
+def page_columns(x0, x1, chars):
+    # Column number of every block of one page: the page is split at empty
+    # vertical strips at least MIN_GUTTER_PT wide, as long as every column
+    # keeps MIN_COLUMN_SHARE of the characters (a strip of shelf codes at
+    # the right margin is not a column)
+    column = np.zeros(len(x0), dtype=np.int64)
+    if len(x0) < 2:
+        return column
+    left, right = x0.min(), x1.max()
+    counted = (chars >= MIN_GUTTER_CHARS) & (x1 - x0 < WIDE_BLOCK_SHARE * (right - left))
+    if not counted.any():
+        return column
+
+    # Points covered by a counted block, from a +1 / -1 difference array
+    bins = int(np.ceil(right - left)) + 1
+    diff = np.zeros(bins + 1, dtype=np.int64)
+    np.add.at(diff, np.floor(x0[counted] - left).astype(np.int64), 1)
+    np.add.at(diff, np.ceil(x1[counted] - left).astype(np.int64), -1)
+    empty = np.cumsum(diff)[:bins] <= 0
+
+    # Empty runs between covered points
+    edges = np.diff(np.concatenate(([0], empty.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    inner = (starts > 0) & (ends < bins) & (ends - starts >= MIN_GUTTER_PT)
+    centers = left + (starts[inner] + ends[inner]) / 2
+
+    center_x = (x0 + x1) / 2
+    total = chars.sum()
+    gutters = []
+    for center in centers:
+        prev = gutters[-1] if gutters else -np.inf
+        left_chars = chars[(center_x >= prev) & (center_x < center)].sum()
+        right_chars = chars[center_x >= center].sum()
+        if min(left_chars, right_chars) >= MIN_COLUMN_SHARE * total:
+            gutters.append(center)
+    if gutters:
+        column = np.searchsorted(np.array(gutters), center_x, side="right")
+    return column
+
+
+def group_pages(pages_blocks, threshold=GROUP_THRESHOLD, columns=False):
+    # group_blocks() of every page's get_text("blocks") list at once; returns
+    # the grouped texts per page
+    counts = [len(blocks) for blocks in pages_blocks]
+    results = [[] for _ in pages_blocks]
+    if not sum(counts):
+        return results
+
+    flat = [b for blocks in pages_blocks for b in blocks]
+    page = np.repeat(np.arange(len(pages_blocks)), counts)
+    x0, y0, x1, y1 = (np.fromiter((b[i] for b in flat), dtype=np.float64, count=len(flat)) for i in range(4))
+    texts = np.array([b[4].strip() for b in flat], dtype=object)
+    keep = texts != ""
+    if not keep.any():
+        return results
+    page, texts = page[keep], texts[keep]
+    x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+
+    column = np.zeros(len(texts), dtype=np.int64)
+    if columns:
+        chars = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+        # Blocks are still in page order here, so every page is one slice
+        bounds = np.searchsorted(page, np.arange(len(pages_blocks) + 1))
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            column[start:end] = page_columns(x0[start:end], x1[start:end], chars[start:end])
+
+    # Stable like list.sort(): equal (y0, x0) keep their get_text() order
+    order = np.lexsort((x0, y0, column, page))
+    page, column, y0, y1 = page[order], column[order], y0[order], y1[order]
+    texts = texts[order].tolist()
+
+    new_group = np.empty(len(order), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = (page[1:] != page[:-1]) | (column[1:] != column[:-1]) | (y0[1:] - y1[:-1] > threshold)
+    bounds = np.append(np.flatnonzero(new_group), len(order))
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        results[page[start]].append(" ".join(texts[start:end]))
+    return results
+
+
+def page_results(page, threshold=GROUP_THRESHOLD):
+    return attach_codes(group_blocks(page.get_text("blocks"), threshold))
+
+
+def extract_range(pdf_path, start_page, end_page, threshold=GROUP_THRESHOLD, engine="loop", columns=False):
+    # Results of the 0-indexed pages start_page..end_page (inclusive)
+    if columns and engine != "numpy":
+        raise ValueError("Column detection needs engine=\"numpy\"")
+    all_results = []
+    with fitz.open(pdf_path) as doc:
+        if engine == "numpy":
+            pages_blocks = [doc.load_page(n).get_text("blocks") for n in range(start_page, end_page + 1)]
+            for grouped in group_pages(pages_blocks, threshold, columns):
+                all_results.extend(attach_codes(grouped))
+        else:
+            for page_num in range(start_page, end_page + 1):
+                all_results.extend(page_results(doc.load_page(page_num), threshold))
+    return all_results
+
+
+def _extract_shard(args):
+    return extract_range(*args)
+
+
+def shard_ranges(start_page, end_page, shards):
+    # Splits start_page..end_page into at most `shards` contiguous ranges
+    pages = end_page - start_page + 1
+    shards = max(1, min(shards, pages))
+    bounds = [start_page + pages * n // shards for n in range(shards + 1)]
+    return [(bounds[n], bounds[n + 1] - 1) for n in range(shards)]
+
+
+def extract_blocks(pdf_path, start_page, end_page, workers=1, threshold=GROUP_THRESHOLD, engine="loop",
+                   columns=False):
+    # Same list as extract_range(); with workers > 1 every worker opens the
+    # PDF itself and handles one contiguous shard, merged in page order
+    if not workers or workers <= 1:
+        return extract_range(pdf_path, start_page, end_page, threshold, engine, columns)
+
+    tasks = [(str(pdf_path), first, last, threshold, engine, columns)
+             for first, last in shard_ranges(start_page, end_page, workers)]
+    all_results = []
+    with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+        for results in pool.map(_extract_shard, tasks):
+            all_results.extend(results)
+    return all_results
@@ -0,0 +1,151 @@
+import io
+
+import numpy as np
+
+from blocks import author_span, code_pattern
+from ocr_cache import write_atomic
+from ocr_engine import page_lines, preprocess, render_range, thresh_data, to_gray
+
+# ----------------------------
+# LINE INDEX: TEXT OFFSET -> PAGE + BOX
+# ----------------------------
+# main07 joins the OCR lines of all pages into one string and loses where
+# they came from. The line index keeps, per line of that string, three
+# arrays:
+#   starts  character offset of the line in the joined text (int64)
+#   pages   PDF page number (int32)
+#   boxes   x0, y0, x1, y1 in pixels at the OCR DPI (int32, n x 4)
+# ~28 bytes per line, saved as <pdf>_lines.npz next to _total.txt. Any text
+# offset - a code_pattern match, a block span - maps back to its line with
+# one searchsorted(), and so to a page and a box on the scan. Boxes are
+# returned in PDF points (1/72 inch), which don't depend on the DPI, so
+# ocr_crop() can re-OCR just that region with any OCR settings.
+#
+# The same is kept per word (word_starts, word_boxes; ~24 bytes per word),
+# so a code gets the box of its own words, not of the whole line it is on.
+# An index saved without them falls back to the line boxes.
+
+CROP_PAD_PT = 4  # margin kept around a re-OCR'd box
+
+
+class LineIndex:
+    def __init__(self, dpi, starts=None, pages=None, boxes=None, chars=0, word_starts=None, word_boxes=None):
+        self.dpi = dpi
+        self.starts = np.zeros(0, dtype=np.int64) if starts is None else starts
+        self.pages = np.zeros(0, dtype=np.int32) if pages is None else pages
+        self.boxes = np.zeros((0, 4), dtype=np.int32) if boxes is None else boxes
+        self.word_starts = np.zeros(0, dtype=np.int64) if word_starts is None else word_starts
+        self.word_boxes = np.zeros((0, 4), dtype=np.int32) if word_boxes is None else word_boxes
+        self.chars = chars  # length of the joined text plus the separator after the last line
+        self._parts = []
+
+    def add_page(self, page_num, lines, boxes, words=None, word_boxes=None):
+        # Lines in the order they are joined, with their page_line_boxes()
+        # boxes, and optionally (for every page) its words and word boxes
+        if not lines:
+            return
+        lengths = np.fromiter((len(line) + 1 for line in lines), dtype=np.int64, count=len(lines))
+        starts = self.chars + np.concatenate(([0], np.cumsum(lengths[:-1])))
+        word_starts = np.zeros(0, dtype=np.int64)
+        if words is not None:
+            # The lines are their words joined by " ", and so is the text
+            word_lengths = np.fromiter((len(word) + 1 for word in words), dtype=np.int64, count=len(words))
+            word_starts = self.chars + np.concatenate(([0], np.cumsum(word_lengths[:-1])))
+        else:
+            word_boxes = np.zeros((0, 4), dtype=np.int32)
+        self.chars += int(lengths.sum())
+        self._parts.append((starts, np.full(len(lines), page_num, dtype=np.int32), boxes, word_starts, word_boxes))
+
+    def _arrays(self):
+        if self._parts:
+            self.starts = np.concatenate([self.starts] + [p[0] for p in self._parts])
+            self.pages = np.concatenate([self.pages] + [p[1] for p in self._parts])
+            self.boxes = np.concatenate([self.boxes] + [p[2] for p in self._parts]).astype(np.int32)
+            self.word_starts = np.concatenate([self.word_starts] + [p[3] for p in self._parts])
+            self.word_boxes = np.concatenate([self.word_boxes] + [p[4] for p in self._parts]).astype(np.int32)
+            self._parts = []
+        return self.starts, self.pages, self.boxes
+
+    def text_length(self):
+        # len(" ".join(lines)) of the indexed lines
+        return max(0, self.chars - 1)
+
+    def save(self, path):
+        starts, pages, boxes = self._arrays()
+        buffer = io.BytesIO()
+        np.savez(buffer, dpi=self.dpi, chars=self.chars, starts=starts, pages=pages, boxes=boxes,
+                 word_starts=self.word_starts, word_boxes=self.word_boxes)
+        write_atomic(path, buffer.getvalue())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            words = (f["word_starts"], f["word_boxes"]) if "word_starts" in f.files else (None, None)
+            return cls(int(f["dpi"]), f["starts"], f["pages"], f["boxes"], int(f["chars"]), *words)
+
+    def _box(self, selected):
+        # Union of pixel boxes, in points
+        box = np.concatenate([selected[:, :2].min(axis=0), selected[:, 2:].max(axis=0)]) * 72 / self.dpi
+        return tuple(round(float(v), 1) for v in box)
+
+    def span(self, start, end, page=None):
+        # (page, box in points) of the text between offsets start and end;
+        # only the lines on `page` (default: the page where the span starts)
+        starts, pages, boxes = self._arrays()
+        first = max(0, np.searchsorted(starts, start, side="right") - 1)
+        last = max(first, np.searchsorted(starts, max(start, end - 1), side="right") - 1)
+        on_page = pages[first:last + 1] == (pages[first] if page is None else page)
+        if not on_page.any():
+            return None, None
+        return int(pages[first:last + 1][on_page][0]), self._box(boxes[first:last + 1][on_page])
+
+    def word_span(self, start, end):
+        # span() from the boxes of only the words overlapping start..end (on
+        # the page of the first one); span() itself without word boxes
+        starts, pages, _ = self._arrays()
+        word_starts = self.word_starts
+        if not len(word_starts):
+            return self.span(start, end)
+        first = max(0, np.searchsorted(word_starts, start, side="right") - 1)
+        word_end = word_starts[first + 1] - 1 if first + 1 < len(word_starts) else self.chars - 1
+        if word_end <= start:
+            first += 1  # start is on the separator after that word
+        last = np.searchsorted(word_starts, end, side="left") - 1
+        if last < first:
+            return self.span(start, end)
+        word_pages = pages[np.searchsorted(starts, word_starts[first:last + 1], side="right") - 1]
+        on_page = word_pages == word_pages[0]
+        return int(word_pages[0]), self._box(self.word_boxes[first:last + 1][on_page])
+
+
+def locate_blocks(ocr_text, blocks, index):
+    # Adds "page", "code_bbox" and "bbox" (points) to the detect_blocks()
+    # blocks of ocr_text. detect_blocks() makes one block per code_pattern
+    # match, so block i runs from the author before match i to the author
+    # before match i + 1. Its box covers the lines on the code's page, the
+    # code's box only the words of the code.
+    matches = list(code_pattern.finditer(ocr_text))
+    if len(matches) != len(blocks):
+        raise ValueError(f"{len(blocks)} blocks for {len(matches)} codes: not the blocks of this text")
+
+    block_starts = [author_span(ocr_text, match.start())[0] for match in matches]
+    block_starts.append(len(ocr_text))
+    for i, (block, match) in enumerate(zip(blocks, matches)):
+        page, code_bbox = index.word_span(match.start(), match.end())
+        block["page"] = page
+        block["code_bbox"] = code_bbox
+        block["bbox"] = index.span(block_starts[i], block_starts[i + 1], page)[1]
+    return blocks
+
+
+def ocr_crop(pdf_path, page_num, bbox, settings, pad=CROP_PAD_PT):
+    # Renders one page and OCRs only bbox (points), e.g. a block's "bbox" to
+    # correct it with other settings; returns its lines
+    scale = settings["dpi"] / 72
+    for _, page in render_range(pdf_path, settings, page_num, page_num):
+        x0, y0 = (max(0, int((v - pad) * scale)) for v in bbox[:2])
+        x1, y1 = (int((v + pad) * scale) + 1 for v in bbox[2:])
+        crop = np.ascontiguousarray(to_gray(page)[y0:y1, x0:x1])
+        thresh = preprocess(crop, settings["threshold"])
+        return page_lines(thresh_data(thresh, {**settings, "text_regions": False}))
+    raise ValueError(f"Page {page_num} could not be rendered from {pdf_path}")
@@ -1,11 +1,11 @@
-from pdf2image import convert_from_path
 from pathlib import Path
-import pytesseract
-import cv2
-import pandas as pd
-import numpy as np
 import re
 
+from blocks import find_author
+from journal import PageJournal
+from ocr_cache import PageCache, write_atomic
+from ocr_engine import iter_ocr, page_lines
+
 # ----------------------------
 # INPUT PDF
 # ----------------------------
@@ -14,6 +14,7 @@ base_name = pdf_path.stem
 output_dir = pdf_path.parent
 ocr_total_path = output_dir / f"{base_name}_total.txt"
 blocks_path = output_dir / f"{base_name}_blocks.txt"
+journal_path = output_dir / f"{base_name}_journal.jsonl"
 
 # ----------------------------
 # OCR SETTINGS
@@ -21,6 +22,15 @@ blocks_path = output_dir / f"{base_name}_blocks.txt"
 OCR_DPI = 300
 TESSERACT_CONFIG = "--oem 3 --psm 12"
 POPPLER_PATH = r"E:\XRZONE_Files\PDFReader\PDFReader\pdf-ris\poppler-25.11.0\Library\bin"
+OCR_CACHE_DIR = output_dir / "ocr_cache"
+OCR_CACHE_MB = 2048
+
+OCR_SETTINGS = {
+    "dpi": OCR_DPI,
+    "threshold": 127,
+    "config": TESSERACT_CONFIG,
+    "poppler_path": POPPLER_PATH,
+}
 
 # ----------------------------
 # PAGE RANGE
@@ -28,55 +38,25 @@ POPPLER_PATH = r"E:\XRZONE_Files\PDFReader\PDFReader\pdf-ris\poppler-25.11.0\Lib
 first_page = 14
 last_page = 341
 
-print(f"🔍 Converting PDF pages {first_page} to {last_page} to images...")
-if POPPLER_PATH:
-    pages = convert_from_path(
-        str(pdf_path),
-        OCR_DPI,
-        poppler_path=POPPLER_PATH,
-        first_page=first_page,
-        last_page=last_page
-    )
-else:
-    pages = convert_from_path(
-        str(pdf_path),
-        OCR_DPI,
-        first_page=first_page,
-        last_page=last_page
-    )
-
-master_lines = []
-
-print("🔠 Running Tesseract OCR...")
-for i, page in enumerate(pages, start=first_page):
-    gray = cv2.cvtColor(np.array(page), cv2.COLOR_RGB2GRAY)
-    _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-    data = pytesseract.image_to_data(
-        thresh,
-        config=TESSERACT_CONFIG,
-        output_type="dict"
-    )
-
-    df = pd.DataFrame(data)
-    df = df[df["conf"].astype(float) > 0]
-
-    page_dict = {}
-    for _, row in df.iterrows():
-        key = f"{i}_{row['par_num']}_{row['line_num']}"
-        text = str(row["text"]).strip()
-        if not text:
-            continue
-        if key not in page_dict:
-            page_dict[key] = text
-        else:
-            page_dict[key] += " " + text
+cache = PageCache(OCR_CACHE_DIR, pdf_path, OCR_SETTINGS, max_mb=OCR_CACHE_MB)
+
+# Every finished page goes to the journal right away, so an interrupted run
+# (or a larger page range) only OCRs the pages that are not in it yet
+page_numbers = range(first_page, last_page + 1)
+journal = PageJournal(journal_path, pdf_path, OCR_SETTINGS)
+todo = journal.missing(page_numbers)
 
-    for key in sorted(page_dict.keys()):
-        master_lines.append(page_dict[key])
+print(f"🔠 Running Tesseract OCR on pages {first_page} to {last_page}: "
+      f"{len(page_numbers) - len(todo)} already in the journal, {len(todo)} to go...")
+for page_num, data in iter_ocr(pdf_path, todo, OCR_SETTINGS, cache=cache):
+    journal.append(page_num, page_lines(data))
+journal.close()
+cache.evict()
 
 # Save full OCR text as a single line
+master_lines = journal.lines(page_numbers)
 ocr_text = " ".join(master_lines)
-ocr_total_path.write_text(ocr_text, encoding="utf-8")
+write_atomic(ocr_total_path, ocr_text.encode("utf-8"))
 print(f"✅ OCR done. Saved to: {ocr_total_path}")
 
 # ----------------------------
@@ -106,9 +86,7 @@ for i, match in enumerate(matches):
     code = match.group()
 
     # Find author: last uppercase sequence before code
-    before_code = ocr_text[:match.start()].rstrip()
-    author_match = re.findall(r'([A-Z ,.\-\'*]+)[\.\*]?$', before_code)
-    author = author_match[-1].strip() if author_match else ""
+    author = find_author(ocr_text, match.start())
 
     # --- AUTHOR CORRECTION ---
     # remove leading dots, numbers, and spaces
@@ -1,10 +1,20 @@
-from pdf2image import convert_from_path
+from functools import partial
 from pathlib import Path
-import pytesseract
-import cv2
 import pandas as pd
-import numpy as np
-import re
+
+import instrument
+from block_store import BlockStore
+from blocks import detect_blocks
+from ocr_cache import PageCache
+from instrument import stage
+from line_index import LineIndex, locate_blocks
+from ocr_engine import iter_ocr, page_line_boxes
+from page_classifier import iter_skip_empty
+from pipeline import iter_ocr_pipeline
+from raster_cache import RasterCache
+from stages import StageStore, code_version, diff_blocks, fingerprint, format_diff
+from text_layer import iter_hybrid
+from word_store import WordStore
 
 # ----------------------------
 # INPUT PDF
@@ -14,6 +24,14 @@ base_name = pdf_path.stem
 output_dir = pdf_path.parent
 ocr_total_path = output_dir / f"{base_name}_total.txt"
 blocks_path = output_dir / f"{base_name}_blocks.txt"
+line_index_path = output_dir / f"{base_name}_lines.npz"
+locations_path = output_dir / f"{base_name}_block_locations.csv"
+words_path = output_dir / f"{base_name}_words"
+csv_path = output_dir / f"{base_name}_blocks.csv"
+diff_path = output_dir / f"{base_name}_blocks_diff.txt"
+provenance_path = output_dir / f"{base_name}_provenance.csv"
+report_path = output_dir / f"{base_name}_run_report.json"
+profile_path = output_dir / f"{base_name}_profile.folded"
 
 # ----------------------------
 # OCR SETTINGS
@@ -21,6 +39,42 @@ blocks_path = output_dir / f"{base_name}_blocks.txt"
 OCR_DPI = 300
 TESSERACT_CONFIG = "--oem 3 --psm 12"
 POPPLER_PATH = r"E:\XRZONE_Files\PDFReader\PDFReader\pdf-ris\poppler-25.11.0\Library\bin"
+RENDER_MEMORY_MB = 256  # rendered pages held in memory at once
+OCR_WORKERS = 1         # > 1 runs pages in a process pool (e.g. os.cpu_count())
+OCR_PIPELINE = False    # overlap render / threshold / OCR / line grouping in threads
+PIPELINE_OCR_THREADS = 4
+PIPELINE_QUEUE_SIZE = 4  # pages waiting between two stages
+OCR_CACHE_DIR = output_dir / "ocr_cache"  # None disables the per-page cache
+OCR_CACHE_MB = 2048
+RASTER_CACHE_DIR = None  # e.g. output_dir / "raster_cache": keep rendered gray pages for re-tuning runs
+RASTER_CACHE_MB = 4096  # ~9 MB per page at 300 DPI
+HYBRID_TEXT_LAYER = False  # use the embedded text where it is good, OCR the rest
+SKIP_EMPTY_PAGES = False   # don't OCR pages whose thumbnail shows no text
+SKIP_IMAGE_PAGES = True    # with SKIP_EMPTY_PAGES: skip illustrations too, not only blank pages
+
+OCR_RENDERER = "poppler_gray"  # "poppler" (RGB), "poppler_gray" or "pymupdf_gray"
+OCR_BACKEND = "pytesseract"  # or "tesserocr": keep one Tesseract engine loaded per worker
+OCR_TEXT_REGIONS = False  # OCR only the text regions of a page, not the margins
+KEEP_WORDS = True        # word-level OCR output in <pdf>_words/ (columnar, see word_store.py)
+WORD_MIN_CONF = None     # e.g. 60: rebuild the text from <pdf>_words/ with only these words, no OCR
+
+INSTRUMENT = True        # per-stage / per-page timings in <pdf>_run_report.json
+TRACE_MEMORY = False     # also per-stage peak memory (tracemalloc, slower)
+WRITE_PROFILE = False    # also <pdf>_profile.folded for flamegraph.pl / speedscope
+
+STAGE_DIR = output_dir / "stage_cache"  # block detection per OCR text + parser version; None disables
+BLOCK_STORE_PATH = None  # e.g. output_dir / "catalogue_blocks.sqlite": blocks of all catalogues, searchable
+
+OCR_SETTINGS = {
+    "dpi": OCR_DPI,
+    "threshold": 127,
+    "config": TESSERACT_CONFIG,
+    "poppler_path": POPPLER_PATH,
+    "renderer": OCR_RENDERER,
+    "backend": OCR_BACKEND,
+    "text_regions": OCR_TEXT_REGIONS,
+    "raster_cache": RasterCache(RASTER_CACHE_DIR, max_mb=RASTER_CACHE_MB) if RASTER_CACHE_DIR else None,
+}
 
 # ----------------------------
 # PAGE RANGE
@@ -28,158 +82,205 @@ POPPLER_PATH = r"E:\XRZONE_Files\PDFReader\PDFReader\pdf-ris\poppler-25.11.0\Lib
 first_page = 14
 last_page = 341
 
-# ----------------------------
-# OCR OR LOAD EXISTING TEXT
-# ----------------------------
-if ocr_total_path.exists():
-    print(f"📄 OCR text exists. Loading: {ocr_total_path}")
-    ocr_text = ocr_total_path.read_text(encoding="utf-8")
-
-else:
-    print(f"🔍 Converting PDF pages {first_page} to {last_page} to images...")
-
-    if POPPLER_PATH:
-        pages = convert_from_path(
-            str(pdf_path),
-            OCR_DPI,
-            poppler_path=POPPLER_PATH,
-            first_page=first_page,
-            last_page=last_page
-        )
-    else:
-        pages = convert_from_path(
-            str(pdf_path),
-            OCR_DPI,
-            first_page=first_page,
-            last_page=last_page
-        )
-
-    master_lines = []
-
-    print("🔠 Running Tesseract OCR...")
-    for i, page in enumerate(pages, start=first_page):
-        gray = cv2.cvtColor(np.array(page), cv2.COLOR_RGB2GRAY)
-        _, thresh = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-
-        data = pytesseract.image_to_data(
-            thresh,
-            config=TESSERACT_CONFIG,
-            output_type="dict"
-        )
-
-        df = pd.DataFrame(data)
-        df = df[df["conf"].astype(float) > 0]
-
-        page_dict = {}
-        for _, row in df.iterrows():
-            key = f"{i}_{row['par_num']}_{row['line_num']}"
-            text = str(row["text"]).strip()
-            if not text:
-                continue
-            page_dict.setdefault(key, "")
-            page_dict[key] += (" " if page_dict[key] else "") + text
-
-        for key in sorted(page_dict.keys()):
-            master_lines.append(page_dict[key])
-
-    ocr_text = " ".join(master_lines)
-    ocr_total_path.write_text(ocr_text, encoding="utf-8")
-    print(f"✅ OCR done. Saved to: {ocr_total_path}")
 
 # ----------------------------
-# TITLE EXTRACTION
+# LINE GROUPING
 # ----------------------------
-def extract_title(block_text, threshold=0.7):
-    words = block_text.split()
-    title_words = []
-
-    for w in words:
-        # Keep only letters for ratio check
-        letters = re.findall(r'[A-Za-z]', w)
-        if not letters:
-            break  # stop if word has no letters
-
-        # Count uppercase letters
-        upper_count = sum(1 for c in letters if c.isupper())
-        ratio = upper_count / len(letters)
-
-        if ratio >= threshold:
-            title_words.append(w)
-        else:
-            break
-
-    return " ".join(title_words).strip()
+def group_lines(pages, words=None, dpi=OCR_DPI):
+    # Line grouping consumes pages as they come out of OCR (or the word
+    # store); the line index remembers the page and box of every line and word
+    master_lines = []
+    line_index = LineIndex(dpi)
+    for page_num, data in pages:
+        with stage("line_grouping", page_num):
+            lines, boxes, page_words, word_boxes = page_line_boxes(data, words=True)
+            master_lines.extend(lines)
+            line_index.add_page(page_num, lines, boxes, page_words, word_boxes)
+        if words is not None:
+            words.add_page(page_num, data)
+    return " ".join(master_lines), line_index
 
 
 # ----------------------------
-# BLOCK DETECTION
+# OCR
 # ----------------------------
-code_pattern = re.compile(r"(83\d{2}\s?[A-Za-z]{1,2}\s?\d{2}(?:-\d{2})?|Leeszaal)")
-matches = list(code_pattern.finditer(ocr_text))
-blocks = []
-
-for i, match in enumerate(matches):
-    code = match.group()
-
-    # Block text
-    start_idx = match.end()
-    end_idx = matches[i + 1].start() if i + 1 < len(matches) else len(ocr_text)
-    block_text = ocr_text[start_idx:end_idx].strip()
-
-    # Find author: last uppercase sequence before code
-    before_code = ocr_text[:match.start()].rstrip()
-    author_match = re.findall(r'([A-Z ,.\-\'*]+)[\.\*]?$', before_code)
-    author = author_match[-1].strip() if author_match else ""
-
-    # --- AUTHOR CORRECTION ---
-    author = re.sub(r'^[^A-Z]+', '', author)
-    author = re.sub(r'[.\*]+$', '', author)
-
-    # --- SUBTRACT AUTHOR FROM PREVIOUS BLOCK ---
-    if i > 0 and author:
-        prev_block = blocks[-1]
-        # Regex removes trailing whitespace/punctuation plus the author
-        pattern = re.escape(author) + r'[\s\.\*]*$'
-        prev_block["text"] = re.sub(pattern, '', prev_block["text"]).rstrip()
-
-    # Extract title
-    title = extract_title(block_text)
-
-    # --- REMOVE TITLE FROM START OF BLOCK TEXT ---
-    if title:
-        title_pattern = re.escape(title) + r'[\s\.\*]*'
-        block_text = re.sub(r'^' + title_pattern, '', block_text, count=1).strip()
-
-    # Append current block
-    blocks.append({
-        "code": code,
-        "author": author,
-        "title": title,
-        "text": block_text
-    })
+def run_ocr():
+    cache = PageCache(OCR_CACHE_DIR, pdf_path, OCR_SETTINGS, max_mb=OCR_CACHE_MB) if OCR_CACHE_DIR else None
+    page_numbers = range(first_page, last_page + 1)
+
+    if OCR_PIPELINE:
+        print(f"🔠 OCR mode: render → threshold → OCR pipeline ({PIPELINE_OCR_THREADS} OCR threads)")
+        ocr_pages = iter_ocr_pipeline
+        ocr_kwargs = {"ocr_threads": PIPELINE_OCR_THREADS, "queue_size": PIPELINE_QUEUE_SIZE}
+    elif OCR_WORKERS > 1:
+        print(f"🔠 OCR mode: process pool ({OCR_WORKERS} workers)")
+        ocr_pages = iter_ocr
+        ocr_kwargs = {"workers": OCR_WORKERS}
+    else:
+        print(f"🔠 OCR mode: serial (≤ {RENDER_MEMORY_MB} MB of pages at a time)")
+        ocr_pages = iter_ocr
+        ocr_kwargs = {}
+    ocr_kwargs.update(max_memory_mb=RENDER_MEMORY_MB, cache=cache)
+
+    skip_report = {}
+    if SKIP_EMPTY_PAGES:
+        ocr_pages = partial(iter_skip_empty, report=skip_report, skip_images=SKIP_IMAGE_PAGES, ocr_pages=ocr_pages)
+
+    provenance = []
+    if HYBRID_TEXT_LAYER:
+        print(f"📑 Reading pages {first_page} to {last_page} from the text layer where possible, OCR for the rest...")
+        pages = iter_hybrid(pdf_path, page_numbers, OCR_SETTINGS, provenance, ocr_pages, **ocr_kwargs)
+    else:
+        print(f"🔍 OCR of pages {first_page} to {last_page}...")
+        pages = ocr_pages(pdf_path, page_numbers, OCR_SETTINGS, **ocr_kwargs)
+
+    words = WordStore(OCR_DPI) if KEEP_WORDS else None
+    ocr_text, line_index = group_lines(pages, words)
+    if words:
+        words.save(words_path)
+        print(f"🔤 Word table saved to: {words_path} ({words.nbytes() / 1024 / 1024:.1f} MB)")
+
+    if cache:
+        removed = cache.evict()
+        if removed:
+            print(f"🧹 Evicted {removed} pages from the OCR cache")
+    if OCR_SETTINGS["raster_cache"]:
+        removed = OCR_SETTINGS["raster_cache"].evict()
+        if removed:
+            print(f"🧹 Evicted {removed} pages from the raster cache")
+
+    if skip_report:
+        kinds = [row["kind"] for row in skip_report["rows"] if not row["ocr"]]
+        print(f"⏭️ Skipped {skip_report['skipped']} of {len(skip_report['rows'])} pages without text "
+              f"({kinds.count('blank')} blank, {kinds.count('image')} image) in "
+              f"{skip_report['classify_seconds']:.1f} s, ~{skip_report['saved_seconds']:.0f} s of OCR saved")
+
+    if provenance:
+        pd.DataFrame(provenance).to_csv(provenance_path, index=False, encoding="utf-8")
+        from_text = sum(1 for row in provenance if row["source"] == "text_layer")
+        print(f"📑 {from_text} of {len(provenance)} pages read from the text layer, "
+              f"{len(provenance) - from_text} OCR'd. Provenance: {provenance_path}")
+
+    return ocr_text, line_index
 
-# ----------------------------
-# WRITE BLOCKS TO FILE
-# ----------------------------
-with blocks_path.open("w", encoding="utf-8") as f:
-    for block in blocks:
-        f.write(
-            f"{block['code']}\n"
-            f"{block['author']}\n"
-            f"{block['title']}\n"
-            f"{block['text']}\n\n"
-        )
-
-print(f"📦 Generated {len(blocks)} blocks")
-print(f"📄 Blocks saved to: {blocks_path}")
 
 # ----------------------------
-# WRITE CSV FILE
+# WRITE BLOCKS
 # ----------------------------
-csv_path = output_dir / f"{base_name}_blocks.csv"
-
-# Convert blocks list of dicts to DataFrame
-df_blocks = pd.DataFrame(blocks, columns=["code", "author", "title", "text"])
-df_blocks.to_csv(csv_path, index=False, encoding="utf-8")
-
-print(f"📊 CSV saved: {csv_path}")
+def write_blocks(blocks):
+    with stage("write_txt"), blocks_path.open("w", encoding="utf-8") as f:
+        for block in blocks:
+            f.write(
+                f"{block['code']}\n"
+                f"{block['author']}\n"
+                f"{block['title']}\n"
+                f"{block['text']}\n\n"
+            )
+    print(f"📄 Blocks saved to: {blocks_path}")
+
+    # Convert blocks list of dicts to DataFrame
+    with stage("write_csv"):
+        df_blocks = pd.DataFrame(blocks, columns=["code", "author", "title", "text"])
+        df_blocks.to_csv(csv_path, index=False, encoding="utf-8")
+    print(f"📊 CSV saved: {csv_path}")
+
+
+def main():
+    if INSTRUMENT:
+        instrument.enable(trace_memory=TRACE_MEMORY)
+
+    # ----------------------------
+    # OCR OR LOAD EXISTING TEXT
+    # ----------------------------
+    words = WordStore.load(words_path) if WORD_MIN_CONF is not None else None
+    if words:
+        print(f"🔤 Rebuilding the text from {words_path} with words of conf ≥ {WORD_MIN_CONF} (no OCR)")
+        ocr_text, line_index = group_lines(words.iter_pages(WORD_MIN_CONF), dpi=words.dpi)
+    elif ocr_total_path.exists():
+        print(f"📄 OCR text exists. Loading: {ocr_total_path}")
+        ocr_text = ocr_total_path.read_text(encoding="utf-8")
+        line_index = LineIndex.load(line_index_path) if line_index_path.exists() else None
+        if line_index is None or line_index.text_length() != len(ocr_text):
+            print("⚠️ No line index for this OCR text, blocks get no page or box")
+            line_index = None
+    else:
+        with stage("ocr"):
+            ocr_text, line_index = run_ocr()
+        ocr_total_path.write_text(ocr_text, encoding="utf-8")
+        line_index.save(line_index_path)
+        print(f"✅ OCR done. Saved to: {ocr_total_path}")
+
+    # ----------------------------
+    # BLOCK DETECTION
+    # ----------------------------
+    # With STAGE_DIR the blocks are reused while the OCR text and blocks.py
+    # are unchanged; after a parser change only detection and writing run,
+    # and the changed blocks are listed in _blocks_diff.txt
+    artifacts = StageStore(STAGE_DIR, base_name) if STAGE_DIR else None
+    parse_key = fingerprint(fingerprint(ocr_text), code_version(detect_blocks))
+    if artifacts:
+        with stage("block_detection"):
+            blocks, reused = artifacts.run("blocks", parse_key, lambda: detect_blocks(ocr_text))
+        previous = None if reused else artifacts.last_result("blocks")
+        if reused:
+            print("♻️ OCR text and parser unchanged, blocks loaded from the stage cache")
+        elif previous is not None:
+            added, removed, changed = diff_blocks(previous, blocks)
+            diff_path.write_text(format_diff(added, removed, changed), encoding="utf-8")
+            print(f"🔀 Blocks vs the last run: {len(changed)} changed, {len(added)} added, "
+                  f"{len(removed)} removed. Diff: {diff_path}")
+    else:
+        with stage("block_detection"):
+            blocks = detect_blocks(ocr_text)
+
+    # ----------------------------
+    # BLOCK LOCATIONS (PAGE + BOX)
+    # ----------------------------
+    if line_index:
+        with stage("block_locations"):
+            locate_blocks(ocr_text, blocks, line_index)
+            pd.DataFrame([
+                {"code": b["code"], "page": b["page"],
+                 **dict(zip(["x0", "y0", "x1", "y1"], b["bbox"] or [None] * 4)),
+                 **dict(zip(["code_x0", "code_y0", "code_x1", "code_y1"], b["code_bbox"] or [None] * 4))}
+                for b in blocks
+            ]).to_csv(locations_path, index=False, encoding="utf-8")
+        print(f"📍 Block pages and boxes (points) saved to: {locations_path}")
+
+    print(f"📦 Generated {len(blocks)} blocks")
+    # The outputs also depend on write_blocks() and its formatting (this file)
+    write_key = fingerprint(parse_key, code_version(write_blocks))
+    if artifacts and artifacts.is_current("write", write_key) and blocks_path.exists() and csv_path.exists():
+        print(f"⏭️ Blocks and writer unchanged, {blocks_path.name} and {csv_path.name} are current")
+    else:
+        write_blocks(blocks)
+        if artifacts:
+            artifacts.mark("write", write_key)
+
+    # ----------------------------
+    # WRITE SQLITE STORE
+    # ----------------------------
+    if BLOCK_STORE_PATH:
+        with stage("write_store"):
+            store = BlockStore(BLOCK_STORE_PATH)
+            store.write_catalogue(pdf_path, blocks, source="main07")
+            store.close()
+        print(f"🗄️ Blocks stored in: {BLOCK_STORE_PATH}")
+
+    # ----------------------------
+    # RUN REPORT
+    # ----------------------------
+    report = instrument.write_report(report_path, profile_path if WRITE_PROFILE else None)
+    if report:
+        print(f"⏱️ Run report: {report_path}")
+        for row in report["stages"][:5]:
+            print(f"   {row['stage']:45} {row['wall_s']:9.2f} s over {row['count']} calls")
+        for row in report["slowest_pages"][:3]:
+            mem = f", {row['peak_mem_mb']:.1f} MB peak" if row["peak_mem_mb"] is not None else ""
+            print(f"   🐢 page {row['page']}: {row['wall_ms'] / 1000:.2f} s ({row['cpu_ms'] / 1000:.2f} s CPU{mem})")
+
+
+# The process pool (OCR_WORKERS > 1) re-imports this script in every worker
+# on Windows, so the run itself only starts from the main process.
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# ----------------------------
+# PER-PAGE OCR CACHE
+# ----------------------------
+# One gzipped JSON file per page holding the word-level image_to_data dict.
+# The file name is a hash of everything that changes the OCR result:
+#   PDF content hash, page number, DPI, threshold, TESSERACT_CONFIG, renderer
+#   (and text_regions when enabled, the backend when not pytesseract)
+# so an interrupted run picks up where it stopped, overlapping page ranges
+# reuse earlier pages, and changing a setting never returns stale output.
+# Reading a page touches its mtime; evict() removes the least recently used
+# pages until the cache fits in max_mb.
+
+_hash_memo = {}
+
+
+def file_hash(path):
+    path = Path(path)
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _hash_memo:
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        _hash_memo[memo_key] = h.hexdigest()
+    return _hash_memo[memo_key]
+
+
+def cache_files(cache_dir, pattern):
+    files = []
+    for path in Path(cache_dir).rglob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue  # removed by another worker meanwhile
+        files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def evict_lru(cache_dir, max_bytes, pattern="*"):
+    # Remove the least recently used files until the total fits in max_bytes
+    files = cache_files(cache_dir, pattern)
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for _, size, path in sorted(files, key=lambda f: f[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except PermissionError:
+            continue  # still open or memory-mapped elsewhere (Windows)
+        total -= size
+        removed += 1
+    return removed
+
+
+def write_atomic(path, payload):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+def ocr_settings_key(settings):
+    # The settings that change the OCR result of a page
+    key = {
+        "dpi": settings["dpi"],
+        "threshold": settings["threshold"],
+        "config": settings["config"],
+        "renderer": settings.get("renderer", "poppler"),
+    }
+    if settings.get("text_regions"):
+        # Only in the key when on, so existing cache entries stay valid
+        key["text_regions"] = True
+    if settings.get("backend", "pytesseract") != "pytesseract":
+        # tesserocr gives slightly different words; likewise only when not the default
+        key["backend"] = settings["backend"]
+    return key
+
+
+class PageCache:
+    def __init__(self, cache_dir, pdf_path, settings, max_mb=2048):
+        self.cache_dir = Path(cache_dir)
+        self.pdf_hash = file_hash(pdf_path)
+        self.settings_key = ocr_settings_key(settings)
+        self.max_mb = max_mb
+
+    def key(self, page_num):
+        raw = json.dumps(
+            {"pdf": self.pdf_hash, "page": page_num, **self.settings_key},
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path(self, page_num):
+        key = self.key(page_num)
+        return self.cache_dir / key[:2] / f"{key}.json.gz"
+
+    def get(self, page_num):
+        path = self.path(page_num)
+        try:
+            data = json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+        except (FileNotFoundError, OSError, ValueError):
+            return None  # missing or half-written page: OCR it again
+        os.utime(path)  # mark as recently used
+        return data
+
+    def put(self, page_num, data):
+        payload = gzip.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        write_atomic(self.path(page_num), payload)
+
+    def evict(self):
+        return evict_lru(self.cache_dir, self.max_mb * 1024 * 1024, "*.json.gz")
+
+
+def split_cached(cache, page_numbers):
+    # Walks the pages in order and yields
+    #   ("cached", page_num, data)   for pages already in the cache
+    #   ("render", start, end)       for runs of consecutive pages to OCR
+    run = []
+    for page_num in page_numbers:
+        data = cache.get(page_num) if cache else None
+        if data is None and run and page_num == run[-1] + 1:
+            run.append(page_num)
+            continue
+
+        if run:
+            yield "render", run[0], run[-1]
+            run = []
+        if data is None:
+            run = [page_num]
+        else:
+            yield "cached", page_num, data
+
+    if run:
+        yield "render", run[0], run[-1]
@@ -0,0 +1,204 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+import pytesseract
+
+import regions
+import tess_api
+from instrument import stage, timed_pages
+from ocr_cache import split_cached
+from page_source import DEFAULT_MAX_MEMORY_MB, iter_rendered
+
+# ----------------------------
+# OCR SETTINGS
+# ----------------------------
+# Every script passes its settings around as one dict so the same values
+# reach the worker processes:
+#   {"dpi": 300, "threshold": 127, "config": "--oem 3 --psm 12", "poppler_path": ...}
+# where "threshold" is a fixed level (0-255) or "otsu" to pick one per page.
+# Optional keys:
+#   "renderer": "poppler" (default, RGB), "poppler_gray" or "pymupdf_gray"
+#               (see page_source.py)
+#   "backend": "pytesseract" (default, one tesseract process per page) or
+#              "tesserocr" (one engine kept in memory per worker, see tess_api.py)
+#   "raster_cache": a raster_cache.RasterCache, so re-runs with another
+#                   threshold or config skip rendering
+#   "text_regions": True to OCR only the text regions of a page (see regions.py)
+
+
+# ----------------------------
+# SINGLE PAGE
+# ----------------------------
+def to_gray(page):
+    if isinstance(page, np.ndarray) and page.ndim == 2:
+        return page  # already 8-bit grayscale
+    return cv2.cvtColor(np.array(page), cv2.COLOR_RGB2GRAY)
+
+
+def preprocess(page, threshold=127):
+    if threshold == "otsu":
+        _, thresh = cv2.threshold(to_gray(page), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    else:
+        _, thresh = cv2.threshold(to_gray(page), threshold, 255, cv2.THRESH_BINARY)
+    return thresh
+
+
+def image_data(thresh, config, backend="pytesseract"):
+    if backend == "tesserocr":
+        return tess_api.image_to_data(thresh, config)
+    return pytesseract.image_to_data(
+        thresh,
+        config=config,
+        output_type="dict"
+    )
+
+
+def thresh_data(thresh, settings):
+    config, backend = settings["config"], settings.get("backend", "pytesseract")
+    if settings.get("text_regions"):
+        return regions.region_data(thresh, settings["dpi"], lambda crop: image_data(crop, config, backend))
+    return image_data(thresh, config, backend)
+
+
+def ocr_image(page, settings):
+    return thresh_data(preprocess(page, settings["threshold"]), settings)
+
+
+def render_range(pdf_path, settings, first_page, last_page, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    # iter_rendered() with the OCR settings, through the raster cache if set
+    render = iter_rendered
+    if settings.get("raster_cache"):
+        render = settings["raster_cache"].iter_rendered
+    return render(
+        pdf_path,
+        settings["dpi"],
+        first_page,
+        last_page,
+        renderer=settings.get("renderer", "poppler"),
+        poppler_path=settings["poppler_path"],
+        max_memory_mb=max_memory_mb
+    )
+
+
+def ocr_page(pdf_path, page_num, settings):
+    for _, page in render_range(pdf_path, settings, page_num, page_num):
+        return ocr_image(page, settings)
+    raise ValueError(f"Page {page_num} could not be rendered from {pdf_path}")
+
+
+# ----------------------------
+# LINE GROUPING
+# ----------------------------
+def _group_lines(data, *columns):
+    # The kept words sorted into (block_num, par_num, line_num) lines: the
+    # word text, the extra columns in the same order and the line bounds
+    conf = np.asarray(data["conf"], dtype=float)
+    text = np.array([str(t).strip() for t in data["text"]], dtype=object)
+    keep = (conf > 0) & (text != "")
+    if not keep.any():
+        return None
+
+    block = np.asarray(data["block_num"], dtype=np.int64)[keep]
+    par = np.asarray(data["par_num"], dtype=np.int64)[keep]
+    line = np.asarray(data["line_num"], dtype=np.int64)[keep]
+
+    # Stable sort: words keep their Tesseract order inside a line
+    order = np.lexsort((line, par, block))
+    block, par, line = block[order], par[order], line[order]
+    extra = [np.asarray(data[c], dtype=np.int64)[keep][order] for c in columns]
+
+    new_line = np.empty(len(order), dtype=bool)
+    new_line[0] = True
+    new_line[1:] = (block[1:] != block[:-1]) | (par[1:] != par[:-1]) | (line[1:] != line[:-1])
+    bounds = np.append(np.flatnonzero(new_line), len(order))
+    return text[keep][order], extra, bounds
+
+
+def page_lines(data):
+    # Joins the words of every (block_num, par_num, line_num) line and returns
+    # the lines in reading order. The keys are compared as integers, so line 10
+    # comes after line 2, and lines from different blocks are kept apart.
+    grouped = _group_lines(data)
+    if grouped is None:
+        return []
+    text, _, bounds = grouped
+    return [" ".join(text[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def page_line_boxes(data, words=False):
+    # page_lines() plus the box (x0, y0, x1, y1) of every line, in pixels at
+    # the OCR DPI, as an (n, 4) int32 array. words=True adds the words in the
+    # order they are joined and their boxes: (lines, boxes, words, word_boxes)
+    grouped = _group_lines(data, "left", "top", "width", "height")
+    if grouped is None:
+        empty = np.zeros((0, 4), dtype=np.int32)
+        return ([], empty, [], empty) if words else ([], empty)
+    text, (left, top, width, height), bounds = grouped
+    starts = bounds[:-1]
+    boxes = np.stack([
+        np.minimum.reduceat(left, starts),
+        np.minimum.reduceat(top, starts),
+        np.maximum.reduceat(left + width, starts),
+        np.maximum.reduceat(top + height, starts),
+    ], axis=1).astype(np.int32)
+    lines = [" ".join(text[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    if not words:
+        return lines, boxes
+    word_boxes = np.stack([left, top, left + width, top + height], axis=1).astype(np.int32)
+    return lines, boxes, text.tolist(), word_boxes
+
+
+# ----------------------------
+# PAGE LISTS (SERIAL OR PROCESS POOL)
+# ----------------------------
+def init_worker():
+    # One Tesseract/OpenCV thread per worker; the pool provides the parallelism
+    # and oversubscribing the cores with OpenMP threads only slows it down.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    cv2.setNumThreads(1)
+
+
+def _ocr_page_task(args):
+    pdf_path, page_num, settings, cache = args
+    data = cache.get(page_num) if cache else None
+    if data is None:
+        data = ocr_page(pdf_path, page_num, settings)
+        if cache:
+            cache.put(page_num, data)
+    return page_num, data
+
+
+def iter_ocr_serial(pdf_path, page_numbers, settings, max_memory_mb=DEFAULT_MAX_MEMORY_MB, cache=None):
+    for kind, page_num, value in split_cached(cache, page_numbers):
+        if kind == "cached":
+            yield page_num, value
+            continue
+
+        # Only the pages missing from the cache get rendered
+        for i, page in timed_pages(render_range(pdf_path, settings, page_num, value, max_memory_mb), "render"):
+            with stage("threshold", i):
+                thresh = preprocess(page, settings["threshold"])
+            with stage("tesseract", i):
+                data = thresh_data(thresh, settings)
+            if cache:
+                cache.put(i, data)
+            yield i, data
+
+
+def iter_ocr_parallel(pdf_path, page_numbers, settings, workers, cache=None):
+    # Each worker renders, thresholds and OCRs its own page, so only the page
+    # number goes in and the word dict comes out. map() keeps page order.
+    tasks = [(str(pdf_path), i, settings, cache) for i in page_numbers]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        # Render/threshold/OCR happen in the workers: only the wait is recorded here
+        yield from timed_pages(pool.map(_ocr_page_task, tasks), "ocr_page (worker)")
+
+
+def iter_ocr(pdf_path, page_numbers, settings, workers=1, max_memory_mb=DEFAULT_MAX_MEMORY_MB, cache=None):
+    # Yields (page_number, image_to_data dict) in the order of page_numbers,
+    # e.g. range(first_page, last_page + 1)
+    if workers and workers > 1:
+        return iter_ocr_parallel(pdf_path, page_numbers, settings, workers, cache)
+    return iter_ocr_serial(pdf_path, page_numbers, settings, max_memory_mb, cache)
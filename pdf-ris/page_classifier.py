@@ -0,0 +1,190 @@
+import time
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+from ocr_engine import iter_ocr
+from page_source import render_pixmap_gray
+
+# ----------------------------
+# BLANK / IMAGE PAGE DETECTION
+# ----------------------------
+# Blank pages, separators and full-page illustrations cost a full 300 DPI
+# render + OCR and never yield a catalogue code. Before the OCR every page
+# is rendered as a small grayscale thumbnail and sorted into
+#   "text"   at least MIN_TEXT_LINES lines of text (see below)
+#   "blank"  no text, and almost no ink (empty pages, separators)
+#   "image"  no text, but plenty of ink (illustrations, plates)
+# The test looks at lines, not at the whole page, so a few entries above
+# an illustration still make a text page. Text-sized connected components
+# are grouped into lines by vertical overlap; a line counts as text when it
+# has MIN_LINE_COMPONENTS components of about the same height (at least
+# MIN_HEIGHT_CONSISTENCY within 0.5-1.5x their median, and the line no
+# taller than twice that), close together (median gap at most the median
+# height) and at most TEXT_MAX_INK ink inside its box. Lines are grouped
+# per column (split at empty strips of COLUMN_GAP_IN), so two columns, or
+# a picture beside the text, don't merge into one uneven line. Measured on
+# thumbnails: text lines have 0.1-0.33 ink in their box and gaps of a
+# pixel or two; textures and photos chain into a few page-high "lines";
+# halftone dot rows have 0.42-0.56 ink, or gaps many times their height
+# where the dots are sparse; hatching is below TEXT_MIN_HEIGHT_IN.
+# bench_page_classifier.py checks these cases on scanned synthetic pages.
+# A page with even a few lines of text counts as "text"; skipping a page
+# that has a code costs an entry, OCR'ing one that has none only costs time.
+# Only "text" pages are OCR'd (and "image" pages too with skip_images=False).
+# Skipped pages come out as empty image_to_data dicts so page order and
+# page counts downstream stay the same.
+
+THUMB_DPI = 100            # the 6 pt type of two-column volumes still comes out as ink
+INK_LEVEL = 128            # darker pixels count as ink
+BLANK_INK = 0.01           # share of ink below which a page without text is blank
+TEXT_MAX_HEIGHT_IN = 0.25  # taller components are not characters/words
+TEXT_MIN_HEIGHT_IN = 0.05  # lower median height: hatching or noise, not text
+MIN_LINE_COMPONENTS = 5    # components in a line of text
+MIN_HEIGHT_CONSISTENCY = 0.8  # share of a line's components within 0.5-1.5x its median height
+TEXT_MAX_INK = 0.38        # more ink in the line's box: halftone dots, not type
+MIN_TEXT_LINES = 2         # fewer text lines: no text on the page
+COLUMN_GAP_IN = 0.2        # wider empty vertical strips separate columns
+
+DATA_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                "left", "top", "width", "height", "conf", "text"]
+
+
+def empty_data():
+    # A fresh image_to_data dict without words, for a skipped page
+    return {c: [] for c in DATA_COLUMNS}
+
+
+def _column_text_lines(stats, integral, dpi):
+    # Lines of text among the components of one column
+    # Sorted by top, a line ends where the next component starts below
+    # every component so far
+    stats = stats[np.argsort(stats[:, cv2.CC_STAT_TOP], kind="stable")]
+    tops = stats[:, cv2.CC_STAT_TOP]
+    bottoms = np.maximum.accumulate(tops + stats[:, cv2.CC_STAT_HEIGHT])
+    new_line = np.empty(len(stats), dtype=bool)
+    new_line[0] = True
+    new_line[1:] = tops[1:] >= bottoms[:-1]
+    bounds = np.append(np.flatnonzero(new_line), len(stats))
+
+    lines = 0
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end - start < MIN_LINE_COMPONENTS:
+            continue
+        line = stats[start:end]
+        heights = line[:, cv2.CC_STAT_HEIGHT]
+        median = float(np.median(heights))
+        y0, y1 = int(tops[start]), int(bottoms[end - 1])
+        if (median < TEXT_MIN_HEIGHT_IN * dpi or y1 - y0 > 2 * median
+                or np.mean((heights >= 0.5 * median) & (heights <= 1.5 * median)) < MIN_HEIGHT_CONSISTENCY):
+            continue
+        line = line[np.argsort(line[:, cv2.CC_STAT_LEFT])]
+        lefts, rights = line[:, cv2.CC_STAT_LEFT], line[:, cv2.CC_STAT_LEFT] + line[:, cv2.CC_STAT_WIDTH]
+        if np.median(lefts[1:] - rights[:-1]) > median:
+            continue
+        x0, x1 = int(lefts[0]), int(rights.max())
+        line_ink = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        if line_ink / ((y1 - y0) * (x1 - x0)) <= TEXT_MAX_INK:
+            lines += 1
+    return lines
+
+
+def text_lines(ink, dpi=THUMB_DPI):
+    # Number of lines of text in a 0/1 ink image (see the header)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    stats = stats[1:]
+    heights = stats[:, cv2.CC_STAT_HEIGHT]
+    text_sized = (heights >= 2) & (heights <= TEXT_MAX_HEIGHT_IN * dpi) & (stats[:, cv2.CC_STAT_AREA] >= 3)
+    stats = stats[text_sized]
+    if len(stats) < MIN_LINE_COMPONENTS:
+        return 0
+
+    # Columns (and a picture beside the text) are split at vertical strips
+    # of at least COLUMN_GAP_IN without components, so lines side by side
+    # with other baselines don't chain into one
+    lefts = stats[:, cv2.CC_STAT_LEFT]
+    edges = np.zeros(ink.shape[1] + 1, dtype=np.int64)
+    np.add.at(edges, lefts, 1)
+    np.add.at(edges, lefts + stats[:, cv2.CC_STAT_WIDTH], -1)
+    empty = np.concatenate(([0], np.cumsum(edges)[:-1] == 0, [0])).astype(np.int8)
+    run_starts = np.flatnonzero(np.diff(empty) == 1)
+    run_ends = np.flatnonzero(np.diff(empty) == -1)
+    gutters = run_starts[run_ends - run_starts >= COLUMN_GAP_IN * dpi]
+    column = np.searchsorted(gutters, lefts, side="right")
+
+    integral = cv2.integral(ink)
+    return sum(_column_text_lines(stats[column == c], integral, dpi) for c in np.unique(column))
+
+
+def thumbnail_stats(gray, dpi=THUMB_DPI):
+    # Returns (ink share, number of lines of text)
+    ink = (np.asarray(gray) < INK_LEVEL).astype(np.uint8)
+    ink_share = float(ink.mean()) if ink.size else 0.0
+    if ink_share == 0.0:
+        return 0.0, 0
+    return ink_share, text_lines(ink, dpi)
+
+
+def classify_thumbnail(gray, dpi=THUMB_DPI):
+    ink_share, lines = thumbnail_stats(gray, dpi)
+    if lines >= MIN_TEXT_LINES:
+        kind = "text"
+    elif ink_share < BLANK_INK:
+        kind = "blank"
+    else:
+        kind = "image"
+    return kind, round(ink_share, 4), lines
+
+
+def classify_pages(pdf_path, page_numbers, dpi=THUMB_DPI):
+    # One row per page of the document, in page order
+    rows = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in page_numbers:
+            if not 1 <= page_num <= doc.page_count:
+                continue
+            kind, ink_share, lines = classify_thumbnail(
+                render_pixmap_gray(doc.load_page(page_num - 1), dpi), dpi)
+            rows.append({
+                "page": page_num,
+                "kind": kind,
+                "ink": ink_share,
+                "text_lines": lines,
+            })
+    return rows
+
+
+def iter_skip_empty(pdf_path, page_numbers, settings, report=None, skip_images=True, ocr_pages=iter_ocr,
+                    **ocr_kwargs):
+    # Yields (page_number, image_to_data dict) in page order, OCR'ing only the
+    # pages with text. report (a dict) gets the per-page rows, the classifier
+    # time and an estimate of the OCR time saved.
+    start = time.perf_counter()
+    rows = classify_pages(pdf_path, page_numbers)
+    classify_seconds = time.perf_counter() - start
+
+    skip = {"blank", "image"} if skip_images else {"blank"}
+    for row in rows:
+        row["ocr"] = row["kind"] not in skip
+    todo = [row["page"] for row in rows if row["ocr"]]
+    ocr_results = iter(ocr_pages(pdf_path, todo, settings, **ocr_kwargs) if todo else ())
+
+    if report is None:
+        report = {}
+    report.update(rows=rows, skipped=len(rows) - len(todo), classify_seconds=classify_seconds,
+                  saved_seconds=-classify_seconds)
+
+    ocr_seconds = 0.0
+    ocr_done = 0
+    for row in rows:
+        if not row["ocr"]:
+            yield row["page"], empty_data()
+            continue
+        start = time.perf_counter()
+        item = next(ocr_results)
+        ocr_seconds += time.perf_counter() - start
+        ocr_done += 1
+        # Skipped pages x the average OCR time per page so far
+        report["saved_seconds"] = report["skipped"] * ocr_seconds / ocr_done - classify_seconds
+        yield item
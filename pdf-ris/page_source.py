@@ -0,0 +1,124 @@
+import fitz  # PyMuPDF
+import numpy as np
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+# ----------------------------
+# STREAMING PAGE SOURCE
+# ----------------------------
+# convert_from_path() returns every page of the range as a full-resolution
+# PIL image at once. At 300 DPI that is ~25 MB per page, so a 328-page range
+# does not fit in memory. iter_pages() renders a small window of pages at a
+# time and hands them out one by one, so peak memory depends on the window
+# (max_memory_mb), not on the size of the page range.
+
+DEFAULT_MAX_MEMORY_MB = 256
+
+
+def page_count(pdf_path, poppler_path=None):
+    info = pdfinfo_from_path(str(pdf_path), poppler_path=poppler_path or None)
+    return int(info["Pages"])
+
+
+def image_nbytes(image):
+    width, height = image.size
+    return width * height * len(image.getbands())
+
+
+def window_size(image, max_memory_mb):
+    # How many pages of this size fit under the memory ceiling (at least one)
+    return max(1, int(max_memory_mb * 1024 * 1024) // image_nbytes(image))
+
+
+def render_pages(pdf_path, dpi, first_page, last_page, poppler_path=None, **kwargs):
+    return convert_from_path(
+        str(pdf_path),
+        dpi,
+        poppler_path=poppler_path or None,
+        first_page=first_page,
+        last_page=last_page,
+        **kwargs
+    )
+
+
+def iter_pages(pdf_path, dpi, first_page=1, last_page=None, poppler_path=None,
+               max_memory_mb=DEFAULT_MAX_MEMORY_MB, **kwargs):
+    # Yields (page_number, image) in page order
+    if last_page is None:
+        last_page = page_count(pdf_path, poppler_path)
+
+    page_num = first_page
+    window = 1  # the first page is rendered alone to measure the page size
+
+    while page_num <= last_page:
+        end_page = min(page_num + window - 1, last_page)
+        images = render_pages(pdf_path, dpi, page_num, end_page, poppler_path=poppler_path, **kwargs)
+        if not images:
+            break
+
+        window = window_size(images[0], max_memory_mb)
+
+        # Drop each image from the window as soon as it is handed out
+        images.reverse()
+        while images:
+            yield page_num, images.pop()
+            page_num += 1
+
+
+# ----------------------------
+# GRAYSCALE RENDERING
+# ----------------------------
+# The OCR only needs 8-bit grayscale, but the "poppler" renderer produces
+# RGB, which is then copied by np.array(page) and converted again by
+# cv2.cvtColor. That is three full-size buffers per page before the
+# threshold. The other renderers produce grayscale directly:
+#   "poppler"       RGB PIL image (as before), converted in preprocess()
+#   "poppler_gray"  pdftoppm -gray, one 1-byte-per-pixel numpy copy
+#   "pymupdf_gray"  PyMuPDF GRAY pixmap, wrapped as a numpy view (no copy)
+
+RENDERERS = ("poppler", "poppler_gray", "pymupdf_gray")
+
+
+class PixmapArray(np.ndarray):
+    # numpy view on a pixmap's samples. PyMuPDF's samples_mv does not keep the
+    # pixmap alive, so the array holds a reference to it.
+    pixmap = None
+
+
+def pixmap_array(pix):
+    # The reference sits on the outermost view: numpy gives every later view
+    # (np.asarray() included) that subclass instance as its base, where a
+    # view made last would be skipped for the plain ndarray under it
+    samples = np.frombuffer(pix.samples_mv, dtype=np.uint8).view(PixmapArray)
+    samples.pixmap = pix
+    return samples.reshape(pix.height, pix.stride)[:, :pix.width * pix.n]
+
+
+def render_pixmap_gray(page, dpi):
+    return pixmap_array(page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False))
+
+
+def iter_rendered(pdf_path, dpi, first_page=1, last_page=None, renderer="poppler", poppler_path=None,
+                  max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    # Yields (page_number, page) where page is an RGB PIL image ("poppler")
+    # or a 2-D uint8 array (the grayscale renderers)
+    if renderer == "pymupdf_gray":
+        with fitz.open(pdf_path) as doc:
+            last_page = doc.page_count if last_page is None else min(last_page, doc.page_count)
+            for page_num in range(first_page, last_page + 1):
+                yield page_num, render_pixmap_gray(doc.load_page(page_num - 1), dpi)
+        return
+
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}, expected one of {RENDERERS}")
+
+    gray = renderer == "poppler_gray"
+    pages = iter_pages(pdf_path, dpi, first_page, last_page, poppler_path=poppler_path,
+                       max_memory_mb=max_memory_mb, grayscale=gray)
+    for page_num, page in pages:
+        yield page_num, np.asarray(page) if gray else page
+
+
+def render_one(pdf_path, dpi, page_num, renderer="poppler", poppler_path=None):
+    for _, page in iter_rendered(pdf_path, dpi, page_num, page_num, renderer, poppler_path):
+        return page
+    return None
@@ -0,0 +1,189 @@
+import os
+import queue
+import threading
+from collections import deque
+
+from instrument import stage, timed_pages
+from ocr_cache import split_cached
+from ocr_engine import preprocess, render_range, thresh_data
+from page_source import DEFAULT_MAX_MEMORY_MB
+
+# ----------------------------
+# STAGED OCR PIPELINE
+# ----------------------------
+# render (poppler) -> preprocess (cv2) -> OCR (tesseract) -> consumer
+#
+# Every stage runs in its own thread and hands pages on through a bounded
+# queue, so a slow stage makes the ones before it wait instead of piling up
+# rendered pages in memory. poppler and tesseract run as subprocesses and
+# cv2 releases the GIL, so the stages really do overlap. Several OCR threads
+# can share the tesseract stage; the consumer gets pages back in page order.
+# Pages found in the OCR cache go straight from the render stage to the
+# consumer.
+#
+# The render stage takes a slot per page and the consumer gives it back
+# when it yields the page, so at most 3 x queue_size + ocr_threads pages are
+# in flight: a slow page holds the stages back instead of the pages after
+# it (or a run of cached ones) piling up in the consumer. When the consumer
+# stops early - an error, break, close() - the stages see `stop` within
+# 0.1 s and the consumer joins them before returning.
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(q, item, stop):
+    # Blocking put that gives up once the consumer has gone away
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    # Blocking get that returns _DONE once the consumer has gone away
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def _acquire(slots, stop):
+    # Takes a page slot, or gives up once the consumer has gone away
+    while not stop.is_set():
+        if slots.acquire(timeout=0.1):
+            return True
+    return False
+
+
+def _render_stage(pdf_path, page_numbers, settings, max_memory_mb, cache, out_q, ocr_q, slots, stop):
+    try:
+        for kind, page_num, value in split_cached(cache, page_numbers):
+            if kind == "cached":
+                # Straight to the consumer, skipping render/preprocess/OCR
+                if not _acquire(slots, stop) or not _put(ocr_q, (page_num, value), stop):
+                    return
+                continue
+
+            for item in timed_pages(render_range(pdf_path, settings, page_num, value, max_memory_mb), "render"):
+                if not _acquire(slots, stop) or not _put(out_q, item, stop):
+                    return
+    except Exception as e:
+        _put(out_q, _StageError(e), stop)
+    _put(out_q, _DONE, stop)
+
+
+def _preprocess_stage(in_q, out_q, threshold, ocr_threads, stop):
+    while True:
+        item = _get(in_q, stop)
+        if item is _DONE or isinstance(item, _StageError):
+            break
+        i, page = item
+        try:
+            with stage("threshold", i):
+                thresh = preprocess(page, threshold)
+        except Exception as e:
+            item = _StageError(e)
+            break
+        if not _put(out_q, (i, thresh), stop):
+            return
+
+    if isinstance(item, _StageError):
+        _put(out_q, item, stop)
+    # One end marker per OCR thread
+    for _ in range(ocr_threads):
+        _put(out_q, _DONE, stop)
+
+
+def _ocr_stage(in_q, out_q, settings, cache, stop):
+    while True:
+        item = _get(in_q, stop)
+        if item is _DONE:
+            break
+        if isinstance(item, _StageError):
+            _put(out_q, item, stop)
+            break
+        i, thresh = item
+        try:
+            with stage("tesseract", i):
+                data = thresh_data(thresh, settings)
+            if cache:
+                cache.put(i, data)
+        except Exception as e:
+            _put(out_q, _StageError(e), stop)
+            break
+        if not _put(out_q, (i, data), stop):
+            return
+    _put(out_q, _DONE, stop)
+
+
+def iter_ocr_pipeline(pdf_path, page_numbers, settings, ocr_threads=1, queue_size=4,
+                      max_memory_mb=DEFAULT_MAX_MEMORY_MB, cache=None):
+    # Yields (page_number, image_to_data dict) in the order of page_numbers
+    page_numbers = list(page_numbers)
+    if ocr_threads > 1:
+        # Parallelism comes from the OCR threads, not from OpenMP inside tesseract
+        os.environ["OMP_THREAD_LIMIT"] = "1"
+
+    render_q = queue.Queue(maxsize=queue_size)
+    thresh_q = queue.Queue(maxsize=queue_size)
+    ocr_q = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    # Pages rendered (or taken from the cache) but not yielded yet
+    slots = threading.Semaphore(3 * queue_size + ocr_threads)
+
+    threads = [
+        threading.Thread(
+            target=_render_stage,
+            args=(pdf_path, page_numbers, settings, max_memory_mb, cache, render_q, ocr_q, slots, stop),
+            name="render",
+            daemon=True
+        ),
+        threading.Thread(
+            target=_preprocess_stage,
+            args=(render_q, thresh_q, settings["threshold"], ocr_threads, stop),
+            name="preprocess",
+            daemon=True
+        ),
+    ]
+    for n in range(ocr_threads):
+        threads.append(threading.Thread(target=_ocr_stage, args=(thresh_q, ocr_q, settings, cache, stop),
+                                        name=f"ocr-{n + 1}", daemon=True))
+    for t in threads:
+        t.start()
+
+    # Consumer: restore page order from the OCR threads
+    finished = 0
+    pending = {}
+    order = deque(page_numbers)
+    try:
+        while finished < ocr_threads:
+            item = _get(ocr_q, stop)
+            if item is _DONE:
+                finished += 1
+                continue
+            if isinstance(item, _StageError):
+                raise item.error
+
+            i, data = item
+            pending[i] = data
+            while order and order[0] in pending:
+                page_num = order.popleft()
+                slots.release()
+                yield page_num, pending.pop(page_num)
+
+        for i in sorted(pending):
+            yield i, pending[i]
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
@@ -0,0 +1,77 @@
+import io
+import os
+from pathlib import Path
+
+import numpy as np
+
+from ocr_cache import evict_lru, file_hash, split_cached, write_atomic
+from ocr_engine import to_gray
+from page_source import DEFAULT_MAX_MEMORY_MB, iter_rendered
+
+# ----------------------------
+# RASTER CACHE
+# ----------------------------
+# Rendering is the slow part of re-running the OCR with another threshold
+# or Tesseract config. This keeps the rendered pages as 8-bit grayscale
+# .npy files, one per page, under
+#   cache_dir / <PDF content hash> / <renderer>_<dpi> / p00015.npy
+# and reads them back memory-mapped, so a re-run with the same DPI and
+# renderer skips rasterization and only re-does threshold + OCR.
+# "poppler" pages (RGB) are stored after the same RGB -> gray conversion
+# preprocess() does, so the threshold sees identical pixels. Size cap and
+# LRU eviction are the OCR cache's (ocr_cache.evict_lru).
+#
+# A RasterCache is not tied to one PDF, so it can sit in the OCR settings
+# dict ("raster_cache") and go to the worker processes with it.
+
+
+class PdfRasters:
+    # The cached pages of one PDF at one DPI and renderer
+    def __init__(self, folder):
+        self.folder = folder
+
+    def path(self, page_num):
+        return self.folder / f"p{page_num:05d}.npy"
+
+    def get(self, page_num):
+        path = self.path(page_num)
+        try:
+            gray = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, OSError, ValueError):
+            return None  # missing or half-written page: render it again
+        os.utime(path)  # mark as recently used
+        return gray
+
+    def put(self, page_num, gray):
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(gray, dtype=np.uint8))
+        write_atomic(self.path(page_num), buffer.getvalue())
+
+
+class RasterCache:
+    def __init__(self, cache_dir, max_mb=4096):
+        self.cache_dir = Path(cache_dir)
+        self.max_mb = max_mb
+
+    def pages(self, pdf_path, dpi, renderer="poppler"):
+        return PdfRasters(self.cache_dir / file_hash(pdf_path) / f"{renderer}_{dpi}")
+
+    def iter_rendered(self, pdf_path, dpi, first_page, last_page, renderer="poppler", poppler_path=None,
+                      max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+        # Like page_source.iter_rendered(), but yields 2-D grayscale arrays
+        # and only renders the pages missing from the cache
+        rasters = self.pages(pdf_path, dpi, renderer)
+        for kind, page_num, value in split_cached(rasters, range(first_page, last_page + 1)):
+            if kind == "cached":
+                yield page_num, value
+                continue
+
+            pages = iter_rendered(pdf_path, dpi, page_num, value, renderer=renderer,
+                                  poppler_path=poppler_path, max_memory_mb=max_memory_mb)
+            for i, page in pages:
+                gray = to_gray(page)
+                rasters.put(i, gray)
+                yield i, gray
+
+    def evict(self):
+        return evict_lru(self.cache_dir, self.max_mb * 1024 * 1024, "*.npy")
@@ -0,0 +1,120 @@
+import cv2
+import numpy as np
+
+# ----------------------------
+# TEXT REGION CROPPING
+# ----------------------------
+# Tesseract gets the whole thresholded page, margins and decorations
+# included. This finds the text regions first: the ink is dilated until
+# words and lines run together into blocks, the blocks become boxes, and
+# specks and long thin rules are dropped. Boxes stacked in the same column
+# less than BLOCK_GAP_IN apart are joined, so a column of catalogue entries
+# is one crop, not one per entry. Boxes that share any rows are joined too:
+# the codes at the right edge of the catalogue are a column of their own,
+# and cropped apart page_lines() would put all codes after all entries
+# instead of each code on its author's line. Each box is OCR'd on its own
+# and the word coordinates are shifted back to page space. Block numbers
+# are offset per region, so (block_num, par_num, line_num) stays unique;
+# regions never share a line, so reading them top to bottom keeps the
+# lines in order.
+#
+# Every region is one Tesseract call, which with pytesseract means one
+# process per region; past MAX_REGIONS the boxes are joined into one crop.
+
+WORD_GAP_IN = 0.2    # horizontal dilation: joins words and columns gaps this wide
+LINE_GAP_IN = 0.1    # vertical dilation: joins lines into paragraphs
+PAD_IN = 0.05        # white margin kept around every crop
+BLOCK_GAP_IN = 0.5   # boxes in the same column closer than this are joined
+MIN_INK_PX = 50      # boxes with less ink are specks
+RULE_HEIGHT_IN = 0.03  # boxes this flat and wider than an inch are rules
+MAX_REGIONS = 12
+
+DATA_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                "left", "top", "width", "height", "conf", "text"]
+
+
+def _merge_boxes(boxes, gap=0):
+    # Joins boxes (x0, y0, x1, y1) that overlap vertically, or overlap
+    # horizontally and are less than `gap` apart vertically, until none are
+    # left to join
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                same_rows = a[1] < b[3] and b[1] < a[3]
+                same_column = a[0] < b[2] and b[0] < a[2] and a[1] < b[3] + gap and b[1] < a[3] + gap
+                if same_rows or same_column:
+                    boxes[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+
+def text_regions(thresh, dpi):
+    # Returns the text boxes (x0, y0, x1, y1) of a thresholded page (black
+    # text on white), top to bottom, left to right
+    height, width = thresh.shape[:2]
+    ink = (thresh == 0).astype(np.uint8)
+    if not ink.any():
+        return []
+
+    kernel = np.ones((max(1, int(LINE_GAP_IN * dpi)), max(1, int(WORD_GAP_IN * dpi))), np.uint8)
+    joined = cv2.dilate(ink, kernel)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(joined, connectivity=8)
+    ink_per_label = np.bincount(labels[ink == 1], minlength=n)
+
+    pad = int(PAD_IN * dpi)
+    dilate_y, dilate_x = kernel.shape[0] // 2, kernel.shape[1] // 2
+    boxes = []
+    for label in range(1, n):
+        if ink_per_label[label] < MIN_INK_PX:
+            continue
+        x, y, w, h = (int(v) for v in stats[label, :4])
+        # Undo the dilation to get back to the ink's own extent
+        ink_w, ink_h = w - 2 * dilate_x, h - 2 * dilate_y
+        if ink_h <= RULE_HEIGHT_IN * dpi and ink_w > dpi:
+            continue
+        boxes.append((max(0, x + dilate_x - pad), max(0, y + dilate_y - pad),
+                      min(width, x + w - dilate_x + pad), min(height, y + h - dilate_y + pad)))
+
+    boxes = _merge_boxes(boxes, int(BLOCK_GAP_IN * dpi))
+    if len(boxes) > MAX_REGIONS:
+        boxes = [(min(b[0] for b in boxes), min(b[1] for b in boxes),
+                  max(b[2] for b in boxes), max(b[3] for b in boxes))]
+    return sorted(boxes, key=lambda b: (b[1], b[0]))
+
+
+def region_data(thresh, dpi, ocr):
+    # OCRs every text region with ocr(crop) -> image_to_data dict and returns
+    # one dict for the page, in page coordinates
+    data = {c: [] for c in DATA_COLUMNS}
+    block_offset = 0
+
+    for x0, y0, x1, y1 in text_regions(thresh, dpi):
+        part = ocr(np.ascontiguousarray(thresh[y0:y1, x0:x1]))
+        blocks = [int(b) for b in part["block_num"]]
+        for c in data:
+            if c == "left":
+                data[c].extend(int(v) + x0 for v in part[c])
+            elif c == "top":
+                data[c].extend(int(v) + y0 for v in part[c])
+            elif c == "block_num":
+                data[c].extend(b + block_offset if b > 0 else 0 for b in blocks)
+            else:
+                data[c].extend(part[c])
+        block_offset += max(blocks, default=0)
+
+    return data
+
+
+def region_pixels(thresh, dpi):
+    # Share of the page's pixels that go to Tesseract with region cropping
+    boxes = text_regions(thresh, dpi)
+    cropped = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+    return cropped / thresh.size if thresh.size else 0.0
@@ -0,0 +1,108 @@
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+
+from ris_extract import extract_ris_entry
+
+# ----------------------------
+# BATCH RIS EXTRACTION
+# ----------------------------
+# Runs extract_ris_entry() over many PDFs in worker processes. Each worker
+# handles one file at a time, so the parent knows which file a worker is on:
+#   - a file that takes longer than `timeout` seconds gets its worker killed
+#   - a worker that dies (e.g. a MuPDF crash on a broken PDF) only loses
+#     that one file
+# and a fresh worker takes its place. Results come back in input order.
+
+
+def _worker_loop(conn):
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        index, pdf_file, kwargs = task
+        try:
+            result = ("ok", extract_ris_entry(Path(pdf_file), **kwargs))
+        except Exception as e:
+            result = ("error", str(e))
+        conn.send((index, result))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.index = None
+        self.started = None
+
+    def assign(self, index, pdf_file, kwargs):
+        self.conn.send((index, str(pdf_file), kwargs))
+        self.index = index
+        self.started = time.monotonic()
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+def iter_batch(pdf_files, workers=None, timeout=60, **extract_kwargs):
+    # Yields (pdf_file, status, entry_or_message) in the order of pdf_files,
+    # status being "ok", "error", "timeout" or "crashed". extract_kwargs are
+    # passed on to extract_ris_entry() (e.g. page_budget)
+    pdf_files = list(pdf_files)
+    ctx = multiprocessing.get_context()
+    workers = max(1, min(workers or multiprocessing.cpu_count(), len(pdf_files) or 1))
+    pool = [_Worker(ctx) for _ in range(workers)]
+    todo = deque(enumerate(pdf_files))
+    results = {}
+    next_index = 0
+
+    try:
+        while next_index < len(pdf_files):
+            for worker in pool:
+                if worker.index is None and todo:
+                    worker.assign(*todo.popleft(), extract_kwargs)
+
+            busy = [w for w in pool if w.index is not None]
+            wait([w.conn for w in busy] + [w.process.sentinel for w in busy], timeout=0.5)
+
+            for n, worker in enumerate(pool):
+                if worker.index is None:
+                    continue
+                index = worker.index
+                if worker.conn.poll():
+                    try:
+                        _, results[index] = worker.conn.recv()
+                        worker.index = None
+                        continue
+                    except EOFError:
+                        pass
+                if not worker.process.is_alive():
+                    results[index] = ("crashed", f"worker exited with code {worker.process.exitcode}")
+                elif time.monotonic() - worker.started > timeout:
+                    results[index] = ("timeout", f"no result after {timeout} s")
+                else:
+                    continue
+                worker.stop(kill=True)
+                pool[n] = _Worker(ctx)
+
+            while next_index in results:
+                status, value = results.pop(next_index)
+                yield pdf_files[next_index], status, value
+                next_index += 1
+    finally:
+        for worker in pool:
+            worker.stop(kill=worker.index is not None)
@@ -0,0 +1,202 @@
+import fitz  # PyMuPDF
+import re
+from bisect import bisect_right
+
+
+# ----------------------------
+# RIS TYPE
+# ----------------------------
+def detect_ris_type(text):
+    if re.search(r'Proceedings of|Conference', text, re.IGNORECASE):
+        return "CONF"
+    elif re.search(r'Journal', text, re.IGNORECASE):
+        return "JOUR"
+    elif re.search(r'Thesis|Dissertation', text, re.IGNORECASE):
+        return "THES"
+    elif re.search(r'Book|Publisher', text, re.IGNORECASE):
+        return "BOOK"
+    else:
+        return "GEN"
+
+
+# ----------------------------
+# LAZY PAGE TEXT
+# ----------------------------
+# Everything in a RIS entry normally sits on the first page or two, so with
+# a page_budget pages are read one at a time and reading stops when
+# page_budget pages have been read, or earlier once every field outside
+# OPTIONAL_FIELDS is found (after at least FRONT_MATTER_PAGES, which title
+# and authors come from). Most papers have no publisher, keywords or
+# conference line, so waiting for those would always run to the budget;
+# they are picked up from the pages read until then. A field only counts
+# as found when its match ends before the end of the text read so far;
+# otherwise the next page could still change it (a year running into more
+# digits, an abstract that only stopped because the text did). Each new
+# page is searched together with the last SEARCH_OVERLAP characters before
+# it (or from where an unfinished match started), not the whole text again.
+# With page_budget=None every page is read at once and searched once, since
+# the title, the authors and the type fallback look at the whole text.
+
+FRONT_MATTER_PAGES = 2
+SEARCH_OVERLAP = 200  # characters before a new page searched again, for matches across the page break
+
+FIELD_PATTERNS = {
+    "conf": re.compile(r'Proceedings of|Conference', re.IGNORECASE),
+    "doi": re.compile(r'(10\.\d{4,9}/[^\s]+)'),
+    "abstract": re.compile(r'Abstract\s*([\s\S]*?)(?=\n\s*Key\s*words|\n\d|\Z)', re.IGNORECASE),
+    "keywords": re.compile(r'Key\s*words?\s*[:\-]?\s*(.*)', re.IGNORECASE),
+    "venue": re.compile(r'(Proceedings of[^\n]+|Conference[^\n]+|Journal[^\n]+)', re.IGNORECASE),
+    "publisher": re.compile(r'Published by\s*([^\n]+)', re.IGNORECASE),
+    "year": re.compile(r'\b(20\d{2})\b'),
+}
+OPTIONAL_FIELDS = {"conf", "doi", "keywords", "venue", "publisher"}
+
+
+class LazyPageText:
+    def __init__(self, doc, page_budget=None):
+        self.doc = doc
+        self.budget = doc.page_count if page_budget is None else min(page_budget, doc.page_count)
+        self.pages = []
+        self.starts = []  # offset of every page in the joined text
+        self.length = 0  # len(self.text)
+        self._text = None
+
+    def load_next(self):
+        if len(self.pages) >= self.budget:
+            return False
+        if self.pages:
+            self.length += 1  # the "\n" between pages
+        self.starts.append(self.length)
+        self.pages.append(self.doc.load_page(len(self.pages)).get_text())
+        self.length += len(self.pages[-1])
+        self._text = None
+        return True
+
+    def load_all(self):
+        while self.load_next():
+            pass
+
+    @property
+    def text(self):
+        # The pages read so far, joined only when asked for
+        if self._text is None:
+            self._text = "\n".join(self.pages)
+        return self._text
+
+    def since(self, offset):
+        # The joined text from offset on, without joining the pages before it
+        i = max(0, bisect_right(self.starts, offset) - 1)
+        return "\n".join(self.pages[i:])[offset - self.starts[i]:]
+
+
+def scan_fields(pages, front_matter_pages=FRONT_MATTER_PAGES, stop_early=True):
+    # Reads pages until every required field is resolved (or, with
+    # stop_early=False, all of them at once); returns the text read and the
+    # match (or None) of every pattern in FIELD_PATTERNS
+    if not stop_early:
+        pages.load_all()
+        text = pages.text
+        return text, {name: pattern.search(text) for name, pattern in FIELD_PATTERNS.items()}
+
+    matches = {}
+    match_starts = {}  # offset in the joined text of an unfinished match
+    resolved = set()
+    searched = 0  # length of the text at the last search
+
+    while pages.load_next():
+        for name, pattern in FIELD_PATTERNS.items():
+            if name in resolved:
+                continue
+            start = match_starts.get(name, max(0, searched - SEARCH_OVERLAP))
+            # One character before the window keeps \b right at its start
+            before = 1 if start else 0
+            window = pages.since(start - before)
+            match = pattern.search(window, before)
+            matches[name] = match
+            if match:
+                match_starts[name] = start - before + match.start()
+                if match.end() < len(window):
+                    resolved.add(name)
+        searched = pages.length
+
+        if len(pages.pages) >= front_matter_pages and set(FIELD_PATTERNS) - OPTIONAL_FIELDS <= resolved:
+            break
+
+    return pages.text, matches
+
+
+# ----------------------------
+# ONE PAPER -> ONE RIS ENTRY
+# ----------------------------
+def extract_ris_entry(pdf_file, page_budget=None):
+    doc = fitz.open(pdf_file)
+    full_text, matches = scan_fields(LazyPageText(doc, page_budget), stop_early=page_budget is not None)
+    doc.close()
+
+    # RIS Type
+    ris_type = "CONF" if matches.get("conf") else detect_ris_type(full_text)
+
+    # DOI
+    doi_match = matches.get("doi")
+    doi = f"https://doi.org/{doi_match.group(1)}" if doi_match else ""
+
+    # Title (largest uppercase line or first long line)
+    lines = full_text.splitlines()
+    title_candidates = [line.strip() for line in lines if line.strip() and line.strip().isupper()]
+    if title_candidates:
+        title = max(title_candidates, key=len).title()
+    else:
+        title = max(lines[:20], key=len).strip().title() if lines else "Untitled"
+
+    # Authors (lines after title)
+    authors = []
+    try:
+        title_index = lines.index(title.upper())
+    except ValueError:
+        title_index = 0
+    for line in lines[title_index+1:title_index+10]:
+        line = line.strip()
+        if not line or re.search(r'\d|@', line):
+            continue
+        if any(c.isalpha() for c in line):
+            authors.append(line.replace(',', '').strip())
+
+    # Abstract
+    abstract_match = matches.get("abstract")
+    abstract = abstract_match.group(1).strip() if abstract_match else ""
+
+    # Keywords
+    kw_match = matches.get("keywords")
+    keywords = [kw.strip() for kw in re.split(r'[;,]', kw_match.group(1))] if kw_match else []
+
+    # Venue
+    venue_match = matches.get("venue")
+    venue = venue_match.group(1).strip() if venue_match else ""
+
+    # Publisher
+    pub_match = matches.get("publisher")
+    publisher = pub_match.group(1).strip() if pub_match else ""
+
+    # Year
+    year_match = matches.get("year")
+    year = year_match.group(1) if year_match else "2024"
+
+    # Build RIS entry
+    ris = f"TY  - {ris_type}\n"
+    ris += f"T1  - {title}\n"
+    for au in authors:
+        ris += f"AU  - {au}\n"
+    ris += f"PY  - {year}\nY1  - {year}\n"
+    if abstract:
+        ris += f"AB  - {abstract}\nN2  - {abstract}\n"
+    for kw in keywords:
+        ris += f"KW  - {kw}\n"
+    if doi:
+        ris += f"U2  - {doi}\nDO  - {doi}\n"
+    if venue:
+        ris += f"T2  - {venue}\n"
+    if publisher:
+        ris += f"PB  - {publisher}\n"
+    ris += "ER  -\n"
+
+    return ris
@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import inspect
+import json
+from pathlib import Path
+
+from ocr_cache import write_atomic
+
+# ----------------------------
+# STAGE ARTIFACTS
+# ----------------------------
+# A stage after OCR (block detection, writing) is a function of its inputs
+# and of the code that runs it. Its result is kept as a gzipped JSON
+# artifact under
+#   stage_dir / <stage>_<fingerprint>.json.gz
+# where the fingerprint hashes the input fingerprints together with the
+# source of the modules the stage runs (code_version()). Re-running with the
+# same OCR text and the same parser loads the artifact; a change to
+# blocks.py gives a new fingerprint, so only that stage and the ones after
+# it run again. A manifest per job remembers the fingerprint each stage had
+# last time, which gives the previous result to diff against and tells
+# whether the written outputs are current. Only the newest KEEP artifacts
+# of a stage are kept.
+
+KEEP = 5
+
+
+def fingerprint(*parts):
+    # sha256 over strings, bytes and earlier fingerprints
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def code_version(*objects):
+    # Fingerprint of the source files of the given modules or functions
+    return fingerprint(*(Path(inspect.getsourcefile(o)).read_bytes() for o in objects))
+
+
+class StageStore:
+    def __init__(self, stage_dir, job):
+        self.stage_dir = Path(stage_dir)
+        self.manifest_path = self.stage_dir / f"{job}.json"
+        try:
+            self.manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self.manifest = {}
+        self.previous = dict(self.manifest)  # the fingerprints of the last run
+
+    def path(self, name, key):
+        return self.stage_dir / f"{name}_{key[:24]}.json.gz"
+
+    def load(self, name, key):
+        try:
+            with gzip.open(self.path(name, key), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return None
+
+    def run(self, name, key, fn):
+        # (result, reused): the artifact of `name` with this fingerprint, or
+        # fn() saved as one
+        result = self.load(name, key)
+        reused = result is not None
+        if not reused:
+            result = fn()
+            payload = json.dumps(result, ensure_ascii=False).encode("utf-8")
+            write_atomic(self.path(name, key), gzip.compress(payload))
+            self._prune(name)
+        self.mark(name, key)
+        return result, reused
+
+    def last_result(self, name):
+        # The result `name` had in the previous run, if its artifact is still there
+        key = self.previous.get(name)
+        return self.load(name, key) if key else None
+
+    def is_current(self, name, key):
+        return self.previous.get(name) == key
+
+    def mark(self, name, key):
+        self.manifest[name] = key
+        write_atomic(self.manifest_path, json.dumps(self.manifest, indent=2).encode("utf-8"))
+
+    def _prune(self, name):
+        artifacts = sorted(self.stage_dir.glob(f"{name}_*.json.gz"), key=lambda p: p.stat().st_mtime, reverse=True)
+        keep = {self.path(n, k) for n, k in self.manifest.items()}
+        for path in artifacts[KEEP:]:
+            if path not in keep:
+                path.unlink(missing_ok=True)
+
+
+# ----------------------------
+# BLOCK DIFF
+# ----------------------------
+def diff_blocks(old, new, fields=("author", "title", "text")):
+    # Blocks are matched on (code, n-th time the code occurs), so one changed
+    # block doesn't shift all blocks after it. Returns (added, removed,
+    # changed) with changed = [(key, {field: (old, new)})]
+    def keyed(blocks):
+        seen = {}
+        out = {}
+        for block in blocks:
+            n = seen[block["code"]] = seen.get(block["code"], 0) + 1
+            out[(block["code"], n)] = block
+        return out
+
+    old, new = keyed(old), keyed(new)
+    added = [key for key in new if key not in old]
+    removed = [key for key in old if key not in new]
+    changed = []
+    for key in new:
+        if key in old:
+            fields_changed = {f: (old[key].get(f), new[key].get(f)) for f in fields
+                              if old[key].get(f) != new[key].get(f)}
+            if fields_changed:
+                changed.append((key, fields_changed))
+    return added, removed, changed
+
+
+def format_diff(added, removed, changed):
+    def label(key):
+        code, n = key
+        return code if n == 1 else f"{code} (#{n})"
+
+    lines = []
+    for key, fields in changed:
+        lines.append(f"~ {label(key)}")
+        for field, (old, new) in fields.items():
+            lines.append(f"    {field}: {old!r}")
+            lines.append(f"    {' ' * len(field)}  {new!r}")
+    lines.extend(f"+ {label(key)}" for key in added)
+    lines.extend(f"- {label(key)}" for key in removed)
+    return "\n".join(lines) + "\n"
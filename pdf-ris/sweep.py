@@ -0,0 +1,158 @@
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from blocks import detect_blocks
+from main07 import (OCR_BACKEND, OCR_RENDERER, POPPLER_PATH, RASTER_CACHE_MB, base_name, first_page, last_page,
+                    output_dir, pdf_path)
+from ocr_engine import init_worker, iter_ocr, page_lines, render_range
+from raster_cache import RasterCache
+
+# ----------------------------
+# OCR SETTINGS SWEEP
+# ----------------------------
+# Runs every (DPI, threshold, TESSERACT_CONFIG) combination on a sample of
+# pages, one combination per worker process, and scores each one by
+#   yield        code matches that come out with an author, title and text
+#   ref_matches  of those, blocks whose code + author are also in the
+#                reference blocks CSV (when there is one)
+#   pages/s      render + threshold + OCR throughput of one worker
+# The Pareto frontier lists the settings no other setting beats on both
+# score and speed: pick the fastest one on it that is good enough.
+# With RASTER_CACHE_DIR the sample pages are rendered into the raster cache
+# for every DPI before any combination is timed, so pages/s measures
+# threshold + OCR only and doesn't depend on which combination happened to
+# render a page first; the render time is reported once per DPI instead
+# (near zero when the pages were already cached by an earlier sweep).
+#
+#   python sweep.py
+
+SWEEP_DPIS = [200, 300, 400]
+SWEEP_THRESHOLDS = [127, 150, "otsu"]
+SWEEP_CONFIGS = ["--oem 3 --psm 12", "--oem 3 --psm 6", "--oem 3 --psm 4"]
+SAMPLE_SIZE = 12  # pages, spread evenly over first_page..last_page
+SWEEP_WORKERS = os.cpu_count()
+RASTER_CACHE_DIR = output_dir / "raster_cache"  # None: every combination renders its own pages
+
+REFERENCE_CSV = output_dir / f"{base_name}_blocks.csv"  # e.g. a checked earlier run; may be missing
+sweep_path = output_dir / f"{base_name}_sweep.csv"
+
+
+def sample_pages(first, last, size):
+    if size >= last - first + 1:
+        return list(range(first, last + 1))
+    step = (last - first) / (size - 1) if size > 1 else 0
+    return sorted({round(first + n * step) for n in range(size)})
+
+
+def load_reference(path):
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8", newline="") as f:
+        return {(row["code"], row["author"].strip()) for row in csv.DictReader(f)}
+
+
+def render_pages(args):
+    # Fills the raster cache with the sample pages at one DPI; returns seconds
+    pdf_path, pages, settings = args
+    start = time.perf_counter()
+    for page_num in pages:
+        for _ in render_range(pdf_path, settings, page_num, page_num):
+            pass
+    return time.perf_counter() - start
+
+
+def run_combination(args):
+    pdf_path, pages, settings, reference = args
+    start = time.perf_counter()
+    lines = []
+    for _, data in iter_ocr(pdf_path, pages, settings):
+        lines.extend(page_lines(data))
+    seconds = time.perf_counter() - start
+
+    blocks = detect_blocks(" ".join(lines))
+    complete = [b for b in blocks if b["author"] and b["title"] and b["text"]]
+    return {
+        "dpi": settings["dpi"],
+        "threshold": settings["threshold"],
+        "config": settings["config"],
+        "codes": len(blocks),
+        "yield": len(complete),
+        "ref_matches": sum((b["code"], b["author"].strip()) in reference for b in complete) if reference else None,
+        "pages_per_s": len(pages) / seconds if seconds else 0.0,
+    }
+
+
+def pareto_frontier(rows, score):
+    # Fastest first; a row is on the frontier if it scores higher than every faster row
+    frontier = []
+    best = None
+    for row in sorted(rows, key=lambda r: (-r["pages_per_s"], -r[score])):
+        if best is None or row[score] > best:
+            frontier.append(row)
+            best = row[score]
+    return frontier
+
+
+def main():
+    pages = sample_pages(first_page, last_page, SAMPLE_SIZE)
+    reference = load_reference(REFERENCE_CSV)
+    score = "ref_matches" if reference else "yield"
+
+    grid = list(itertools.product(SWEEP_DPIS, SWEEP_THRESHOLDS, SWEEP_CONFIGS))
+    raster_cache = RasterCache(RASTER_CACHE_DIR, max_mb=RASTER_CACHE_MB) if RASTER_CACHE_DIR else None
+    tasks = []
+    for dpi, threshold, config in grid:
+        settings = {
+            "dpi": dpi,
+            "threshold": threshold,
+            "config": config,
+            "poppler_path": POPPLER_PATH,
+            "renderer": OCR_RENDERER,
+            "backend": OCR_BACKEND,
+            "raster_cache": raster_cache,
+        }
+        tasks.append((str(pdf_path), pages, settings, reference))
+
+    print(f"🧪 {len(grid)} settings × {len(pages)} pages ({pages[0]}–{pages[-1]}), {SWEEP_WORKERS} workers")
+    if reference:
+        print(f"📏 Scoring against {len(reference)} reference blocks: {REFERENCE_CSV}")
+    else:
+        print("📏 No reference blocks CSV, scoring by block yield")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=SWEEP_WORKERS, initializer=init_worker) as pool:
+        if raster_cache:
+            # One task per DPI, before any combination is timed
+            first_of_dpi = {}
+            for task in tasks:
+                first_of_dpi.setdefault(task[2]["dpi"], task[:3])
+            for dpi, seconds in zip(first_of_dpi, pool.map(render_pages, first_of_dpi.values())):
+                print(f"🖼️ dpi={dpi:<4} render {seconds / len(pages):.2f} s/page (once, into the raster cache)")
+
+        for row in pool.map(run_combination, tasks):
+            rows.append(row)
+            print(f"  dpi={row['dpi']:<4} threshold={str(row['threshold']):<5} {row['config']:<17} "
+                  f"{score}={row[score]:<4} {row['pages_per_s']:.2f} pages/s")
+
+    if raster_cache:
+        removed = raster_cache.evict()
+        if removed:
+            print(f"🧹 Evicted {removed} pages from the raster cache")
+
+    pd.DataFrame(rows).to_csv(sweep_path, index=False, encoding="utf-8")
+
+    print(f"\n🏁 Pareto frontier ({score} vs pages/s, fastest first):")
+    for row in pareto_frontier(rows, score):
+        print(f"  dpi={row['dpi']:<4} threshold={str(row['threshold']):<5} {row['config']:<17} "
+              f"{score}={row[score]:<4} {row['pages_per_s']:.2f} pages/s")
+    print(f"📄 All results saved to: {sweep_path}")
+
+
+# Worker processes re-import this script on Windows
+if __name__ == "__main__":
+    main()
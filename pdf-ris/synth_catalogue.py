@@ -0,0 +1,126 @@
+import random
+import textwrap
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# ----------------------------
+# SYNTHETIC CATALOGUE PDFS
+# ----------------------------
+# Offline stand-ins for the Jitta catalogue: entries with an uppercase
+# author line ending in a "83xx X yy" code (sometimes "-zz" or
+# "Leeszaal"), an uppercase title and a few lines of description. The same
+# pages come as
+#   text-layer PDFs  (insert_text, read by main03 / layout.py)
+#   image-only PDFs  (every page stored as a grayscale scan, for the OCR)
+# in one column, or in two (columns=2, smaller type) like the later volumes,
+# and as OCR-like text for the block parser. Everything is seeded, so the
+# same size always gives the same document.
+
+ENTRIES_PER_PAGE = 6
+SCAN_DPI = 150
+
+SURNAMES = ["ALBERES", "ASTORG", "EASTWOOD", "FRIEDRICH", "MEYER", "VAN DEN BERG", "DUBOIS", "ROSSI",
+            "SCHMIDT", "JANSSEN", "O'NEILL", "KOWALSKI", "DE VRIES", "MÜLLER", "LEFÈVRE"]
+TITLE_WORDS = ["LA", "LITTERATURE", "EUROPEENNE", "AVENTURE", "INTELLECTUELLE", "HISTORY", "OF",
+               "MODERN", "POETRY", "DE", "GESCHIEDENIS", "VAN", "HET", "ROMAN", "ESSAYS", "THEATRE"]
+PLACES = ["Paris", "London", "Amsterdam", "Berlin", "New York", "Leiden"]
+PUBLISHERS = ["Albin Michel", "Eds. du Seuil", "Penguin", "Meulenhoff", "Suhrkamp", "Gallimard"]
+
+
+def random_code(rng):
+    if rng.random() < 0.05:
+        return "Leeszaal"
+    code = f"83{rng.randint(10, 99)} {rng.choice('ABCDEFGHKL')} {rng.randint(10, 99)}"
+    if rng.random() < 0.1:
+        code += f"-{rng.randint(10, 99)}"
+    return code
+
+
+def random_entry(rng):
+    author = f"{rng.choice(SURNAMES)}, {rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice('ABCDEFGHJKLMNPRSTW')}."
+    title = " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(3, 7)))
+    year = rng.randint(1930, 1990)
+    details = [
+        f"{rng.choice(PLACES)}, {rng.choice(PUBLISHERS)}, {year}. {rng.randint(17, 25)} cm, "
+        f"{rng.randint(80, 600)} blz., lit. opgn.",
+    ]
+    if rng.random() < 0.5:
+        details.append("Met een inleiding en aantekeningen; " + str(rng.randint(2, 5)) + "me éd.")
+    return {"author": author, "code": random_code(rng), "title": title, "details": details}
+
+
+def catalogue_entries(pages, seed=0):
+    rng = random.Random(seed)
+    return [[random_entry(rng) for _ in range(ENTRIES_PER_PAGE)] for _ in range(pages)]
+
+
+def draw_page(page, entries, page_num, columns=1):
+    # Column x positions and type scale: one column at the left margin, or
+    # two of 234 points with the codes at their right edge
+    lefts, code_dx, scale = ([72], 358, 1.0) if columns == 1 else ([40, 310], 190, 0.65)
+    per_column = -(-len(entries) // columns)
+    for n, left in enumerate(lefts):
+        y = 72
+        for entry in entries[n * per_column:(n + 1) * per_column]:
+            page.insert_text((left, y), entry["author"] + " *", fontsize=9 * scale)
+            page.insert_text((left + code_dx, y), entry["code"], fontsize=9 * scale)
+            y += 12
+            # Long titles wrap inside a narrow column
+            for line in [entry["title"]] if columns == 1 else textwrap.wrap(entry["title"], 40):
+                page.insert_text((left, y), line, fontsize=9 * scale)
+                y += 12
+            for line in entry["details"]:
+                page.insert_text((left + 12, y), line, fontsize=8 * scale)
+                y += 11
+            y += 14
+    page.insert_text((290, 800), str(page_num), fontsize=8)
+
+
+def catalogue_params(pages, image_only=False, seed=0, columns=1):
+    # What make_catalogue() stores in the PDF's keywords to recognise its file
+    return f"synth_catalogue pages={pages} columns={columns} seed={seed} scan={int(bool(image_only))}"
+
+
+def make_catalogue(path, pages, image_only=False, seed=0, columns=1):
+    # Writes the catalogue to path and returns path. An existing file is
+    # only reused when it was made with the same parameters (kept in its
+    # keywords); otherwise it is written again.
+    path = Path(path)
+    params = catalogue_params(pages, image_only, seed, columns)
+    if path.exists():
+        try:
+            with fitz.open(path) as existing:
+                if existing.metadata.get("keywords") == params:
+                    return path
+        except (fitz.FileDataError, RuntimeError):
+            pass  # unreadable (e.g. cut short): written again
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    doc = fitz.open()
+    for page_num, entries in enumerate(catalogue_entries(pages, seed), start=1):
+        page = doc.new_page()
+        draw_page(page, entries, page_num, columns)
+        if image_only:
+            pix = page.get_pixmap(dpi=SCAN_DPI, colorspace=fitz.csGRAY)
+            rect = page.rect
+            doc.delete_page(-1)
+            doc.new_page(width=rect.width, height=rect.height).insert_image(rect, pixmap=pix)
+
+    doc.set_metadata({"keywords": params})
+    tmp_path = path.with_name(path.name + ".tmp")
+    doc.save(tmp_path, garbage=3, deflate=True)
+    doc.close()
+    tmp_path.replace(path)
+    return path
+
+
+def ocr_like_text(pages, seed=0):
+    # The catalogue as main07's _total.txt would have it: all lines joined by spaces
+    lines = []
+    for entries in catalogue_entries(pages, seed):
+        for entry in entries:
+            lines.append(f"{entry['author']} * {entry['code']}")
+            lines.append(entry["title"])
+            lines.extend(entry["details"])
+    return " ".join(lines)
@@ -0,0 +1,119 @@
+import shlex
+import threading
+
+try:
+    import tesserocr
+    from tesserocr import PSM, RIL, OEM, PyTessBaseAPI
+except ImportError:  # optional: pip install tesserocr
+    tesserocr = None
+
+# ----------------------------
+# IN-PROCESS TESSERACT (tesserocr)
+# ----------------------------
+# pytesseract.image_to_data() writes the page to a temp PNG, starts a
+# tesseract process, loads the LSTM model and parses TSV for every page.
+# This backend keeps one initialised engine per thread (so one per pool
+# worker, one per pipeline OCR thread), hands it the thresholded numpy
+# buffer directly and walks the result iterator into the same dict that
+# image_to_data(output_type="dict") returns.
+
+DATA_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                "left", "top", "width", "height", "conf", "text"]
+
+_local = threading.local()
+
+
+def available():
+    return tesserocr is not None
+
+
+def parse_config(config):
+    # "--oem 3 --psm 12 -l nld+eng -c preserve_interword_spaces=1"
+    options = {"lang": "eng", "psm": PSM.AUTO, "oem": OEM.DEFAULT, "variables": {}, "tessdata": None}
+    args = shlex.split(config)
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        value = args[i + 1] if i + 1 < len(args) else None
+        if arg == "--psm":
+            options["psm"] = int(value)
+        elif arg == "--oem":
+            options["oem"] = int(value)
+        elif arg == "-l":
+            options["lang"] = value
+        elif arg == "--tessdata-dir":
+            options["tessdata"] = value
+        elif arg == "-c":
+            name, _, var = value.partition("=")
+            options["variables"][name] = var
+        else:
+            i += 1
+            continue
+        i += 2
+    return options
+
+
+def get_api(config):
+    # One engine per (thread, config); the model is loaded once
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+    if config not in apis:
+        options = parse_config(config)
+        kwargs = {"lang": options["lang"], "psm": options["psm"], "oem": options["oem"]}
+        if options["tessdata"]:
+            kwargs["path"] = options["tessdata"]
+        api = PyTessBaseAPI(**kwargs)
+        for name, value in options["variables"].items():
+            api.SetVariable(name, value)
+        apis[config] = api
+    return apis[config]
+
+
+def _add_row(data, level, nums, box, conf, text):
+    left, top, right, bottom = box or (0, 0, 0, 0)
+    row = [level, 1, *nums, left, top, right - left, bottom - top, conf, text]
+    for column, value in zip(DATA_COLUMNS, row):
+        data[column].append(value)
+
+
+def image_to_data(thresh, config):
+    if tesserocr is None:
+        raise RuntimeError("OCR backend 'tesserocr' needs the tesserocr package (pip install tesserocr)")
+
+    height, width = thresh.shape[:2]
+    api = get_api(config)
+    api.SetImageBytes(thresh.tobytes(), width, height, 1, width)
+    api.Recognize()
+
+    # Same numbering as tesseract's TSV renderer
+    data = {column: [] for column in DATA_COLUMNS}
+    _add_row(data, 1, (0, 0, 0, 0), (0, 0, width, height), -1, "")
+
+    block_num = par_num = line_num = word_num = 0
+    it = api.GetIterator()
+    if it is not None:
+        while True:
+            if not it.Empty(RIL.WORD):
+                if it.IsAtBeginningOf(RIL.BLOCK):
+                    block_num += 1
+                    par_num = line_num = word_num = 0
+                    _add_row(data, 2, (block_num, 0, 0, 0), it.BoundingBox(RIL.BLOCK), -1, "")
+                if it.IsAtBeginningOf(RIL.PARA):
+                    par_num += 1
+                    line_num = word_num = 0
+                    _add_row(data, 3, (block_num, par_num, 0, 0), it.BoundingBox(RIL.PARA), -1, "")
+                if it.IsAtBeginningOf(RIL.TEXTLINE):
+                    line_num += 1
+                    word_num = 0
+                    _add_row(data, 4, (block_num, par_num, line_num, 0), it.BoundingBox(RIL.TEXTLINE), -1, "")
+                word_num += 1
+                _add_row(
+                    data, 5, (block_num, par_num, line_num, word_num),
+                    it.BoundingBox(RIL.WORD), it.Confidence(RIL.WORD), it.GetUTF8Text(RIL.WORD)
+                )
+            if not it.Next(RIL.WORD):
+                break
+
+    api.Clear()
+    return data
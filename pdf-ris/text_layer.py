@@ -0,0 +1,98 @@
+import fitz  # PyMuPDF
+
+from ocr_engine import iter_ocr
+
+# ----------------------------
+# HYBRID TEXT LAYER / OCR READER
+# ----------------------------
+# Pages with a usable embedded text layer are read with PyMuPDF (as main03
+# does); only scanned or garbled pages go through poppler + Tesseract. The
+# text layer is returned in the same image_to_data dict shape as the OCR
+# path (coordinates in pixels at the OCR DPI, conf 100), so page_lines(),
+# the cache and everything downstream treat both sources alike.
+
+MIN_CHARS = 40        # fewer non-space characters: treat the page as scanned
+MIN_GOOD_RATIO = 0.9  # share of letters, digits and ordinary punctuation
+MIN_WORD_RATIO = 0.6  # share of tokens that look like words or numbers
+
+GOOD_PUNCTUATION = set(".,;:!?'\"()[]-–—/&*%+’‘“”«»")
+
+
+def text_layer_data(page, dpi):
+    # page.get_text("words") -> (x0, y0, x1, y1, word, block_no, line_no, word_no)
+    scale = dpi / 72
+    columns = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text"]
+    data = {c: [] for c in columns}
+
+    for x0, y0, x1, y1, word, block_no, line_no, word_no in page.get_text("words"):
+        row = [5, page.number + 1, block_no + 1, 1, line_no + 1, word_no + 1,
+               round(x0 * scale), round(y0 * scale),
+               round((x1 - x0) * scale), round((y1 - y0) * scale), 100, word]
+        for c, v in zip(columns, row):
+            data[c].append(v)
+    return data
+
+
+def _looks_like_word(token):
+    letters = [c for c in token if c.isalpha()]
+    if not letters:
+        return any(c.isdigit() for c in token)
+    return len(letters) >= len(token) / 2
+
+
+def text_quality(words):
+    # Returns (ok, share of good characters, share of word-like tokens)
+    chars = "".join(words)
+    if len(chars) < MIN_CHARS:
+        return False, 0.0, 0.0
+
+    good = sum(1 for c in chars if c.isalnum() or c in GOOD_PUNCTUATION)
+    good -= chars.count("\ufffd") * 10  # replacement characters: broken font encoding
+    good_ratio = max(good, 0) / len(chars)
+    word_ratio = sum(1 for w in words if _looks_like_word(w)) / len(words)
+
+    ok = good_ratio >= MIN_GOOD_RATIO and word_ratio >= MIN_WORD_RATIO
+    return ok, round(good_ratio, 3), round(word_ratio, 3)
+
+
+def classify_pages(pdf_path, page_numbers, dpi):
+    # Returns {page_number: text-layer dict} for the usable pages and one
+    # provenance row per page of the document
+    text_pages = {}
+    provenance = []
+
+    with fitz.open(pdf_path) as doc:
+        for page_num in page_numbers:
+            if not 1 <= page_num <= doc.page_count:
+                continue
+            data = text_layer_data(doc.load_page(page_num - 1), dpi)
+            ok, good_ratio, word_ratio = text_quality(data["text"])
+            if ok:
+                text_pages[page_num] = data
+            provenance.append({
+                "page": page_num,
+                "source": "text_layer" if ok else "ocr",
+                "words": len(data["text"]),
+                "good_chars": good_ratio,
+                "word_like": word_ratio,
+            })
+
+    return text_pages, provenance
+
+
+def iter_hybrid(pdf_path, page_numbers, settings, provenance=None, ocr_pages=iter_ocr, **ocr_kwargs):
+    # Yields (page_number, image_to_data dict) in page order. ocr_pages is the
+    # OCR source for the remaining pages (iter_ocr or iter_ocr_pipeline).
+    text_pages, rows = classify_pages(pdf_path, page_numbers, settings["dpi"])
+    if provenance is not None:
+        provenance.extend(rows)
+
+    scanned = [row["page"] for row in rows if row["source"] == "ocr"]
+    ocr_results = iter(ocr_pages(pdf_path, scanned, settings, **ocr_kwargs) if scanned else ())
+
+    for row in rows:
+        if row["source"] == "text_layer":
+            yield row["page"], text_pages.pop(row["page"])
+        else:
+            yield next(ocr_results)
@@ -0,0 +1,152 @@
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+
+from ocr_cache import write_atomic
+
+# ----------------------------
+# COLUMNAR WORD STORE
+# ----------------------------
+# The word-level image_to_data output of a whole document, kept instead of
+# being reduced to lines and thrown away. One numpy array per column:
+#   page, block_num, par_num, line_num, word_num   int32
+#   left, top, width, height                       int32 (pixels at the OCR DPI)
+#   conf                                           float32
+#   text                                           uint32 id into a string pool
+# The pool holds every distinct word once (catalogues repeat "blz.", "cm",
+# place names, ...) as one UTF-8 blob plus offsets. Only rows with text are
+# kept, whatever their conf, so the words can be re-thresholded on conf
+# later. ~44 bytes per word, against several hundred for a dict or
+# DataFrame row.
+#
+# On disk it is a folder of .npy files (<pdf>_words/) that load() memory-maps,
+# so a 5,000-page catalogue opens instantly and only the pages that are read
+# come into memory. meta.json is written last: a folder without it is an
+# unfinished store.
+
+INT_COLUMNS = ["page", "block_num", "par_num", "line_num", "word_num", "left", "top", "width", "height"]
+
+
+class WordStore:
+    def __init__(self, dpi, columns=None, pool=None, pool_offsets=None, page_table=None):
+        self.dpi = dpi
+        self.columns = columns  # name -> array, once built or loaded
+        self.pool = pool  # UTF-8 bytes of all distinct words
+        self.pool_offsets = pool_offsets  # word i is pool[pool_offsets[i]:pool_offsets[i + 1]]
+        self.page_table = page_table  # (page, first row, end row) per page
+        self._parts = []
+        self._ids = {}
+        self._strings = None
+
+    # ----------------------------
+    # BUILDING
+    # ----------------------------
+    def add_page(self, page_num, data):
+        if self.columns is not None:
+            raise ValueError("add_page() after the store was saved or loaded")
+        text = [str(t).strip() for t in data["text"]]
+        keep = np.fromiter((t != "" for t in text), dtype=bool, count=len(text))
+        if not keep.any():
+            return
+        ids = np.fromiter((self._ids.setdefault(t, len(self._ids)) for t, k in zip(text, keep) if k),
+                          dtype=np.uint32)
+        part = {c: np.asarray(data[c], dtype=np.int32)[keep] for c in INT_COLUMNS if c != "page"}
+        part["page"] = np.full(len(ids), page_num, dtype=np.int32)
+        part["conf"] = np.asarray(data["conf"], dtype=np.float32)[keep]
+        part["text"] = ids
+        self._parts.append(part)
+
+    def _finish(self):
+        if self.columns is not None:
+            return
+        names = INT_COLUMNS + ["conf", "text"]
+        parts = sorted(self._parts, key=lambda p: int(p["page"][0]))
+        self.columns = {c: np.concatenate([p[c] for p in parts]) if parts else np.zeros(0, dtype=np.int32)
+                        for c in names}
+
+        encoded = [s.encode("utf-8") for s in self._ids]
+        self.pool = b"".join(encoded)
+        self.pool_offsets = np.concatenate(([0], np.cumsum([len(b) for b in encoded], dtype=np.int64)))
+
+        sizes = [len(p["text"]) for p in parts]
+        ends = np.cumsum(sizes, dtype=np.int64)
+        self.page_table = np.array([(int(p["page"][0]), end - size, end)
+                                    for p, size, end in zip(parts, sizes, ends)], dtype=np.int64).reshape(-1, 3)
+        # The pool replaces the parts and the interning dict
+        self._parts = []
+        self._ids = None
+
+    def save(self, folder):
+        self._finish()
+        folder = Path(folder)
+        arrays = {**self.columns, "pool_offsets": self.pool_offsets, "page_table": self.page_table}
+        for name, array in arrays.items():
+            buffer = io.BytesIO()
+            np.save(buffer, array)
+            write_atomic(folder / f"{name}.npy", buffer.getvalue())
+        write_atomic(folder / "pool.bin", self.pool)
+        meta = {"dpi": self.dpi, "words": len(self.columns["text"]), "distinct": len(self.pool_offsets) - 1,
+                "pages": len(self.page_table)}
+        write_atomic(folder / "meta.json", json.dumps(meta).encode("utf-8"))
+
+    @classmethod
+    def load(cls, folder):
+        # None when the folder holds no finished store
+        folder = Path(folder)
+        try:
+            meta = json.loads((folder / "meta.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        columns = {c: np.load(folder / f"{c}.npy", mmap_mode="r") for c in INT_COLUMNS + ["conf", "text"]}
+        return cls(meta["dpi"], columns, (folder / "pool.bin").read_bytes(),
+                   np.load(folder / "pool_offsets.npy"), np.load(folder / "page_table.npy"))
+
+    # ----------------------------
+    # READING
+    # ----------------------------
+    def strings(self, ids):
+        # The words behind text ids
+        self._finish()
+        if self._strings is None:
+            self._strings = {}
+        pool, offsets = self.pool, self.pool_offsets
+        out = []
+        for i in np.asarray(ids).tolist():
+            s = self._strings.get(i)
+            if s is None:
+                s = self._strings[i] = pool[offsets[i]:offsets[i + 1]].decode("utf-8")
+            out.append(s)
+        return out
+
+    def page_numbers(self):
+        self._finish()
+        return [int(p) for p in self.page_table[:, 0]]
+
+    def page_data(self, page_num, min_conf=None):
+        # The page as an image_to_data dict (words only), for page_lines(),
+        # page_line_boxes() and the rest; min_conf drops words below it
+        self._finish()
+        row = np.flatnonzero(self.page_table[:, 0] == page_num)
+        if not len(row):
+            return None
+        _, start, end = self.page_table[row[0]]
+        rows = slice(int(start), int(end))
+        keep = slice(None) if min_conf is None else np.asarray(self.columns["conf"][rows]) >= min_conf
+
+        data = {c: np.asarray(self.columns[c][rows])[keep] for c in INT_COLUMNS + ["conf"]}
+        data["page_num"] = data.pop("page")
+        data["level"] = np.full(len(data["conf"]), 5, dtype=np.int32)
+        data["text"] = self.strings(np.asarray(self.columns["text"][rows])[keep])
+        return data
+
+    def iter_pages(self, min_conf=None):
+        # (page_num, data) in page order, shaped like iter_ocr()'s output
+        for page_num in self.page_numbers():
+            yield page_num, self.page_data(page_num, min_conf)
+
+    def nbytes(self):
+        self._finish()
+        return (sum(a.nbytes for a in self.columns.values()) + len(self.pool)
+                + self.pool_offsets.nbytes + self.page_table.nbytes)